@@ -13,4 +13,8 @@ def create_app():
     from app.routes import main_bp
     app.register_blueprint(main_bp)
     
+    # Register CLI commands
+    from app.cli import register_commands
+    register_commands(app)
+    
     return app 
\ No newline at end of file
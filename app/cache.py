@@ -0,0 +1,260 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+from urllib.parse import urlparse, parse_qsl
+
+from app.database import Database
+
+# Default time-to-live in seconds, keyed by API resource or by response part.
+# Statistics move constantly, snippet and channel metadata rarely change.
+DEFAULT_TTLS = {
+    'statistics': 5 * 60,
+    'commentThreads': 5 * 60,
+    'playlistItems': 15 * 60,
+    'contentDetails': 6 * 60 * 60,
+    'snippet': 6 * 60 * 60,
+    'search': 24 * 60 * 60,
+}
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def request_key(request):
+    """Build a key identifying an API request by its method and parameters."""
+    # The API key is part of the URI but does not change the response
+    params = sorted(
+        (name, value) for name, value in parse_qsl(urlparse(request.uri).query)
+        if name != 'key'
+    )
+    return request.methodId + '?' + '&'.join(f'{name}={value}' for name, value in params)
+
+
+class MemoryBackend:
+    """In-process LRU store bounded by the total size of cached payloads."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, payload, expires_at):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (payload, expires_at)
+            self.total_bytes += size
+            # Evict least recently used entries until we fit the memory bound
+            while self.total_bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= len(entry[0])
+
+
+class DiskBackend:
+    """SQLite-backed LRU store that survives restarts and is shared between workers."""
+
+    def __init__(self, path, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._db = Database(
+            path,
+            'CREATE TABLE IF NOT EXISTS responses ('
+            'key TEXT PRIMARY KEY, payload TEXT, expires_at REAL, accessed_at REAL, size INTEGER);'
+            'CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);',
+            autocommit=True
+        )
+
+    @property
+    def _conn(self):
+        return self._db.connection
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            row = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()
+        return row[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT payload, expires_at FROM responses WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                'UPDATE responses SET accessed_at = ? WHERE key = ?', (time.time(), key)
+            )
+            return row[0], row[1]
+
+    def set(self, key, payload, expires_at):
+        size = len(payload)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                (key, payload, expires_at, time.time(), size)
+            )
+            total = self._conn.execute('SELECT SUM(size) FROM responses').fetchone()[0]
+            # Evict least recently used entries until we fit the size bound
+            while total > self.max_bytes:
+                oldest_key, oldest_size = self._conn.execute(
+                    'SELECT key, size FROM responses ORDER BY accessed_at LIMIT 1'
+                ).fetchone()
+                self._conn.execute('DELETE FROM responses WHERE key = ?', (oldest_key,))
+                total -= oldest_size
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+class ResponseCache:
+    """TTL cache for YouTube Data API responses, keyed by API method and parameters.
+
+    Expired responses are kept until evicted or replaced, so they can be
+    revalidated with their ETag instead of downloaded again.
+    """
+
+    def __init__(self, backend=None, ttls=None):
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.hits = Counter()
+        self.misses = Counter()
+        self.expirations = Counter()
+        self.revalidations = Counter()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Create the cache configured by the YOUTUBE_CACHE_* environment variables."""
+        backend_name = os.getenv('YOUTUBE_CACHE_BACKEND', 'memory')
+        max_bytes = int(os.getenv('YOUTUBE_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+        if backend_name == 'none':
+            return None
+        if backend_name == 'disk':
+            path = os.getenv('YOUTUBE_CACHE_PATH', os.path.join('data', 'api_cache.sqlite3'))
+            return cls(DiskBackend(path, max_bytes=max_bytes))
+        if backend_name == 'memory':
+            return cls(MemoryBackend(max_bytes=max_bytes))
+        raise ValueError(f'Unknown cache backend: {backend_name}')
+
+    def key_for(self, request):
+        """Build a cache key from the API method and its parameters."""
+        return request_key(request)
+
+    def ttl_for(self, request):
+        """Get the time-to-live of a response, using the shortest-lived part it contains."""
+        resource = request.methodId.split('.')[1]
+        if resource in self.ttls:
+            return self.ttls[resource]
+        parts = dict(parse_qsl(urlparse(request.uri).query)).get('part', '').split(',')
+        part_ttls = [self.ttls[part] for part in parts if part in self.ttls]
+        return min(part_ttls) if part_ttls else min(self.ttls.values())
+
+    def get(self, request):
+        """Get the cached response for a request, or None when missing or expired."""
+        key = self.key_for(request)
+        resource = request.methodId.split('.')[1]
+        entry = self.backend.get(key)
+        if entry is not None and entry[1] <= time.time():
+            with self._lock:
+                self.expirations[resource] += 1
+            entry = None
+        with self._lock:
+            if entry is None:
+                self.misses[resource] += 1
+                return None
+            self.hits[resource] += 1
+        return json.loads(entry[0])
+
+    def get_stale(self, request):
+        """Get the cached response for a request even if it has expired, or None."""
+        entry = self.backend.get(self.key_for(request))
+        if entry is None:
+            return None
+        return json.loads(entry[0])
+
+    def revalidated(self, request, response):
+        """Store an expired response again after the API confirmed it is unchanged."""
+        with self._lock:
+            self.revalidations[request.methodId.split('.')[1]] += 1
+        self.set(request, response)
+
+    def set(self, request, response, payload=None):
+        """Store a response for as long as its resource's TTL allows.
+
+        payload is the response already serialized to JSON, if the caller has it.
+        """
+        ttl = self.ttl_for(request)
+        if ttl <= 0:
+            return
+        if payload is None:
+            payload = json.dumps(response)
+        self.backend.set(self.key_for(request), payload, time.time() + ttl)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Get hit, miss and eviction counts."""
+        with self._lock:
+            return {
+                'hits': sum(self.hits.values()),
+                'misses': sum(self.misses.values()),
+                'expirations': sum(self.expirations.values()),
+                'revalidations': sum(self.revalidations.values()),
+                'evictions': self.backend.evictions,
+                'entries': len(self.backend),
+                'bytes': self.backend.total_bytes,
+                'max_bytes': self.backend.max_bytes,
+                'by_resource': {
+                    resource: {
+                        'hits': self.hits[resource],
+                        'misses': self.misses[resource],
+                        'revalidations': self.revalidations[resource]
+                    }
+                    for resource in set(self.hits) | set(self.misses)
+                }
+            }
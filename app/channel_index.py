@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+from app.database import Database
+
+# How long a "Channel not found" answer is trusted before searching again
+DEFAULT_NEGATIVE_TTL = 24 * 60 * 60
+
+
+class ChannelIndex:
+    """Persistent mapping of channel handles and custom names to channel IDs.
+
+    Resolving a handle costs a 100-unit search().list call, while the mapping
+    itself almost never changes, so resolved names are kept in SQLite.
+    Names that did not match any channel are remembered for a limited time.
+    """
+
+    NOT_FOUND = object()
+
+    def __init__(self, path, negative_ttl=DEFAULT_NEGATIVE_TTL):
+        self.path = path
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._db = Database(
+            path,
+            'CREATE TABLE IF NOT EXISTS channel_names ('
+            'name TEXT PRIMARY KEY, channel_id TEXT, resolved_at REAL);',
+            autocommit=True
+        )
+
+    @property
+    def _conn(self):
+        return self._db.connection
+
+    @classmethod
+    def from_env(cls):
+        """Create the index configured by the CHANNEL_INDEX_* environment variables."""
+        path = os.getenv('CHANNEL_INDEX_PATH', os.path.join('data', 'channel_index.sqlite3'))
+        if path == 'none':
+            return None
+        negative_ttl = int(os.getenv('CHANNEL_INDEX_NEGATIVE_TTL', DEFAULT_NEGATIVE_TTL))
+        return cls(path, negative_ttl=negative_ttl)
+
+    @staticmethod
+    def normalize(name):
+        """Normalize a handle or custom name, which YouTube treats case-insensitively."""
+        return name.strip().lower()
+
+    def lookup(self, name):
+        """Get the channel ID for a name, NOT_FOUND for known misses, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT channel_id, resolved_at FROM channel_names WHERE name = ?',
+                (self.normalize(name),)
+            ).fetchone()
+        if row is None:
+            return None
+        channel_id, resolved_at = row
+        if channel_id is not None:
+            return channel_id
+        if time.time() - resolved_at < self.negative_ttl:
+            return self.NOT_FOUND
+        return None
+
+    def store(self, name, channel_id):
+        """Remember the channel ID of a name, or None when no channel matched."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO channel_names VALUES (?, ?, ?)',
+                (self.normalize(name), channel_id, time.time())
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM channel_names').fetchone()[0]
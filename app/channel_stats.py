@@ -0,0 +1,150 @@
+import heapq
+import math
+from collections import deque
+
+from app.records import format_timestamp
+
+# Number of uploads in the recent and oldest windows that trends compare
+TREND_WINDOW = 5
+TOP_VIDEOS = 5
+RECENT_VIDEOS = 10
+
+
+def engagement_rate(views, likes, comments):
+    if views == 0:
+        return 0
+    return ((likes + comments) / views) * 100
+
+
+class RunningStats:
+    """Running mean and variance (Welford's algorithm)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self):
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+
+class ChannelAccumulator:
+    """Channel analytics computed in one pass over the uploads, newest first.
+
+    Memory stays bounded by the window sizes however many videos a channel
+    has: gaps between uploads feed running statistics, the most viewed
+    videos live in a bounded heap and the newest and oldest uploads in
+    fixed-size buffers.
+    """
+
+    def __init__(self):
+        self.gaps = RunningStats()
+        self.views = RunningStats()
+        self.engagement = RunningStats()
+        self.recent_videos = []
+        self._top_videos = []
+        self._newest = []
+        self._oldest = deque(maxlen=TREND_WINDOW)
+        self._recent_gaps = []
+        self._oldest_gaps = deque(maxlen=TREND_WINDOW)
+        self._previous_upload = None
+
+    def add(self, video):
+        """Fold the next (older) VideoRecord into the aggregates."""
+        if self._previous_upload is not None:
+            gap = abs((self._previous_upload - video.published_at).days)
+            self.gaps.add(gap)
+            if len(self._recent_gaps) < TREND_WINDOW:
+                self._recent_gaps.append(gap)
+            self._oldest_gaps.append(gap)
+        self._previous_upload = video.published_at
+
+        self.views.add(video.views)
+        self.engagement.add(engagement_rate(video.views, video.likes, video.comments))
+
+        entry = (video.views, -self.views.count, video)
+        if len(self._top_videos) < TOP_VIDEOS:
+            heapq.heappush(self._top_videos, entry)
+        elif entry > self._top_videos[0]:
+            heapq.heapreplace(self._top_videos, entry)
+
+        if len(self._newest) < TREND_WINDOW:
+            self._newest.append(video)
+        self._oldest.append(video)
+        if len(self.recent_videos) < RECENT_VIDEOS:
+            self.recent_videos.append(video)
+
+    @property
+    def total_videos(self):
+        return self.views.count
+
+    def upload_analysis(self):
+        """Upload frequency statistics, in days between uploads."""
+        if self.total_videos == 0:
+            return {
+                'average_frequency': 0,
+                'total_videos': 0,
+                'frequency_trend': 'No data available'
+            }
+        if self.total_videos < 2:
+            return {
+                'average_frequency': 0,
+                'total_videos': 1,
+                'frequency_trend': 'Insufficient data'
+            }
+
+        recent_gap = sum(self._recent_gaps) / len(self._recent_gaps)
+        old_gap = sum(self._oldest_gaps) / len(self._oldest_gaps)
+        # Shorter gaps between recent uploads mean the channel uploads more often
+        if recent_gap < old_gap:
+            trend = 'Increasing upload frequency'
+        elif recent_gap > old_gap:
+            trend = 'Decreasing upload frequency'
+        else:
+            trend = 'Stable upload frequency'
+
+        return {
+            'average_frequency': round(self.gaps.mean, 1),
+            'frequency_std': round(self.gaps.std, 1),
+            'total_videos': self.total_videos,
+            'frequency_trend': trend
+        }
+
+    def performance_trends(self):
+        """View trend, top videos and averages across all uploads."""
+        if self.total_videos == 0:
+            return {
+                'view_trend': 'No data',
+                'engagement_trend': 'No data',
+                'top_performing_videos': []
+            }
+
+        avg_recent_views = sum(video.views for video in self._newest) / len(self._newest)
+        avg_old_views = sum(video.views for video in self._oldest) / len(self._oldest)
+        top_videos = [video for _, _, video in sorted(self._top_videos, reverse=True)]
+
+        return {
+            'view_trend': 'Increasing' if avg_recent_views > avg_old_views else 'Decreasing',
+            'top_performing_videos': [
+                {
+                    'title': video.title,
+                    'views': video.views,
+                    'engagement_rate': engagement_rate(video.views, video.likes, video.comments),
+                    'published_at': format_timestamp(video.published_at)
+                }
+                for video in top_videos
+            ],
+            'average_views': self.views.mean,
+            'average_engagement_rate': self.engagement.mean
+        }
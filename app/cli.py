@@ -0,0 +1,114 @@
+import click
+from app.quota import QuotaExceededError
+
+
+def register_commands(app):
+    """Register the maintenance commands on the Flask CLI."""
+
+    @app.cli.command('warm-channels')
+    @click.argument('url_file', type=click.File('r'))
+    def warm_channels(url_file):
+        """Resolve the channel URLs listed in URL_FILE (one per line) into the channel index."""
+        from app.routes import youtube_service
+
+        channel_urls = [line.strip() for line in url_file if line.strip() and not line.startswith('#')]
+        results = youtube_service.warm_channel_index(channel_urls)
+        click.echo(f"Resolved {results['resolved']} channels, {results['not_found']} not found")
+        for failure in results['failed']:
+            click.echo(f"Failed {failure['url']}: {failure['error']}", err=True)
+
+    @app.cli.command('watch')
+    @click.argument('urls', nargs=-1, required=True)
+    def watch(urls):
+        """Add video or channel URLs to the background refresh watchlist."""
+        from app.routes import youtube_service
+        from app.tracker import Watchlist
+
+        watchlist = Watchlist.from_env()
+        for url in urls:
+            try:
+                watchlist.add('video', youtube_service.extract_video_id(url))
+            except (ValueError, KeyError):
+                try:
+                    watchlist.add('channel', youtube_service.extract_channel_id(url))
+                except ValueError as e:
+                    click.echo(f'Skipped {url}: {e}', err=True)
+
+    @app.cli.command('track')
+    @click.option('--poll-interval', default=60, show_default=True, help='Seconds between refresh passes.')
+    @click.option('--once', is_flag=True, help='Refresh what is due once and exit.')
+    def track(poll_interval, once):
+        """Run the background worker that refreshes watched videos and channels."""
+        from app.routes import youtube_service
+        from app.tracker import Tracker, Watchlist
+
+        tracker = Tracker(youtube_service, Watchlist.from_env())
+        if once:
+            click.echo(tracker.refresh_due())
+            return
+        tracker.run(poll_interval=poll_interval, log=click.echo)
+
+    @app.cli.group('export')
+    def export_group():
+        """Export channel videos, comment sentiment or snapshots as Parquet, Arrow or NDJSON."""
+
+    def write_export(table, batches, output, fmt):
+        from app import export
+
+        if fmt is None:
+            extension = getattr(output, 'name', '').rsplit('.', 1)[-1]
+            formats = {ext: name for name, ext in export.FILE_EXTENSIONS.items()}
+            fmt = formats.get(extension, 'ndjson' if extension == 'jsonl' else export.default_format())
+        try:
+            export.check_format(fmt)
+        except ValueError as e:
+            raise click.UsageError(str(e))
+        try:
+            for chunk in export.iter_export(batches, table, fmt):
+                output.write(chunk)
+        except (ValueError, QuotaExceededError) as e:
+            raise click.ClickException(str(e))
+
+    format_option = click.option(
+        '--format', 'fmt', type=click.Choice(['parquet', 'arrow', 'ndjson']),
+        help='Output format, guessed from the output file extension by default.'
+    )
+    output_option = click.option(
+        '--output', '-o', type=click.File('wb'), default='-', help='File to write, stdout by default.'
+    )
+
+    @export_group.command('channel-videos')
+    @click.argument('channel_url')
+    @click.option('--max-results', type=int, help='Export only the most recent uploads.')
+    @format_option
+    @output_option
+    def export_channel_videos(channel_url, max_results, fmt, output):
+        """Export the uploads of CHANNEL_URL with their statistics."""
+        from app.export import channel_video_batches
+        from app.routes import youtube_service
+
+        write_export('channel_videos', channel_video_batches(youtube_service, channel_url, max_results), output, fmt)
+
+    @export_group.command('comments')
+    @click.argument('video_url')
+    @click.option('--max-comments', type=int, help='Stop after this many comments.')
+    @format_option
+    @output_option
+    def export_comments(video_url, max_comments, fmt, output):
+        """Export the comments of VIDEO_URL with their sentiment polarity."""
+        from app.export import comment_batches
+        from app.routes import youtube_service
+
+        write_export('comments', comment_batches(youtube_service, video_url, max_comments), output, fmt)
+
+    @export_group.command('snapshots')
+    @click.argument('videos', nargs=-1, required=True)
+    @format_option
+    @output_option
+    def export_snapshots(videos, fmt, output):
+        """Export the recorded statistics snapshots of VIDEOS (URLs or IDs)."""
+        from app.export import snapshot_batches
+        from app.routes import youtube_service
+
+        video_ids = [youtube_service.to_video_id(video) for video in videos]
+        write_export('snapshots', snapshot_batches(youtube_service, video_ids), output, fmt)
@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+
+from app.database import Database
+from app.sentiment import POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD, TOP_NEGATIVE_COMMENTS
+
+
+class CommentStore:
+    """Local store of scored comments with per-video sentiment aggregates.
+
+    Comments are keyed by their comment thread ID and stored with their
+    polarity, so a re-analysis only has to fetch and score comments posted
+    since the previous sync. Syncs that stopped short of the stored or the
+    oldest comments leave a cursor, the page token to resume from.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = Database(
+            path,
+            'CREATE TABLE IF NOT EXISTS comments ('
+            '  comment_id TEXT PRIMARY KEY, video_id TEXT, author TEXT, text TEXT,'
+            '  published_at TEXT, like_count INTEGER, polarity REAL);'
+            'CREATE INDEX IF NOT EXISTS comments_video_polarity ON comments (video_id, polarity);'
+            'CREATE TABLE IF NOT EXISTS video_sentiment ('
+            '  video_id TEXT PRIMARY KEY, positive INTEGER, negative INTEGER, neutral INTEGER,'
+            '  synced_at REAL);'
+            'CREATE TABLE IF NOT EXISTS comment_cursors ('
+            '  video_id TEXT, page_token TEXT, PRIMARY KEY (video_id, page_token));'
+        )
+
+    @property
+    def _conn(self):
+        return self._db.connection
+
+    @classmethod
+    def from_env(cls):
+        """Create the store configured by COMMENT_STORE_PATH, or None when disabled."""
+        path = os.getenv('COMMENT_STORE_PATH', 'none')
+        if path == 'none':
+            return None
+        return cls(path)
+
+    def known_ids(self, comment_ids):
+        """Get which of the given comment IDs are already stored."""
+        if not comment_ids:
+            return set()
+        placeholders = ','.join('?' * len(comment_ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT comment_id FROM comments WHERE comment_id IN ({placeholders})',
+                list(comment_ids)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def get_cursors(self, video_id):
+        """Get the page tokens that earlier syncs of a video stopped at, oldest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT page_token FROM comment_cursors WHERE video_id = ? ORDER BY rowid',
+                (video_id,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def add_comments(self, video_id, comments, polarities, resumed=(), cursors=()):
+        """Store newly scored comments and update the video's aggregates in place.
+
+        Only comments that were not stored yet are counted, so overlapping
+        syncs of the same video cannot inflate the aggregates. The resumed
+        cursors are replaced by the new cursors in the same transaction.
+        """
+        positive = negative = neutral = 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'DELETE FROM comment_cursors WHERE video_id = ? AND page_token = ?',
+                [(video_id, page_token) for page_token in resumed]
+            )
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO comment_cursors VALUES (?, ?)',
+                [(video_id, page_token) for page_token in cursors]
+            )
+            for comment, polarity in zip(comments, polarities):
+                inserted = self._conn.execute(
+                    'INSERT OR IGNORE INTO comments VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (comment.id, video_id, comment.author, comment.text,
+                     comment.published_at, comment.like_count, float(polarity))
+                ).rowcount
+                if not inserted:
+                    continue
+                if polarity > POSITIVE_THRESHOLD:
+                    positive += 1
+                elif polarity < NEGATIVE_THRESHOLD:
+                    negative += 1
+                else:
+                    neutral += 1
+            self._conn.execute(
+                'INSERT INTO video_sentiment VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (video_id) DO UPDATE SET '
+                '  positive = positive + excluded.positive,'
+                '  negative = negative + excluded.negative,'
+                '  neutral = neutral + excluded.neutral,'
+                '  synced_at = excluded.synced_at',
+                (video_id, positive, negative, neutral, time.time())
+            )
+
+    def get_sentiment(self, video_id):
+        """Get the sentiment breakdown of a video's stored comments.
+
+        complete is False while a backfill cursor is left, as the stored
+        comments then miss some of the video's comments.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT positive, negative, neutral FROM video_sentiment WHERE video_id = ?',
+                (video_id,)
+            ).fetchone()
+            negative_rows = self._conn.execute(
+                'SELECT text, author, polarity, published_at FROM comments '
+                'WHERE video_id = ? AND polarity < ? ORDER BY polarity, published_at LIMIT ?',
+                (video_id, NEGATIVE_THRESHOLD, TOP_NEGATIVE_COMMENTS)
+            ).fetchall()
+            complete = self._conn.execute(
+                'SELECT 1 FROM comment_cursors WHERE video_id = ? LIMIT 1', (video_id,)
+            ).fetchone() is None
+
+        total = sum(row) if row else 0
+        if not total:
+            return {
+                'positive': 0,
+                'negative': 0,
+                'neutral': 0,
+                'total_comments': 0,
+                'negative_comments': [],
+                'complete': complete
+            }
+
+        positive, negative, neutral = row
+        return {
+            'positive': (positive / total) * 100,
+            'negative': (negative / total) * 100,
+            'neutral': (neutral / total) * 100,
+            'total_comments': total,
+            'negative_comments': [
+                {'text': text, 'author': author, 'polarity': polarity, 'published_at': published_at}
+                for text, author, polarity, published_at in negative_rows
+            ],
+            'complete': complete
+        }
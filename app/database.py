@@ -0,0 +1,49 @@
+import os
+import sqlite3
+
+
+def connect(path, autocommit=False):
+    """Open a SQLite database in WAL mode that threads can share, creating its directory.
+
+    With autocommit every statement commits on its own, otherwise
+    transactions are committed by using the connection as a context manager.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if autocommit:
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    else:
+        conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    return conn
+
+
+class Database:
+    """SQLite database opened on first use in each process, with its schema.
+
+    SQLite connections must not be carried across fork(), so a process
+    forked after the database was opened, like a worker of an app preloaded
+    by gunicorn, opens a connection of its own. Callers serialize access
+    with their own lock.
+    """
+
+    def __init__(self, path, schema, autocommit=False):
+        self.path = path
+        self.schema = schema
+        self.autocommit = autocommit
+        self._conn = None
+        self._pid = None
+        self._inherited = []
+
+    @property
+    def connection(self):
+        pid = os.getpid()
+        if self._pid != pid:
+            if self._conn is not None:
+                # Closing the parent's connection here could release its locks, so keep it unused
+                self._inherited.append(self._conn)
+            self._conn = connect(self.path, self.autocommit)
+            self._conn.executescript(self.schema)
+            self._pid = pid
+        return self._conn
@@ -0,0 +1,220 @@
+import json
+from datetime import datetime
+
+from app.channel_stats import engagement_rate
+from app.records import format_timestamp, parse_timestamp
+from app.sentiment import POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    # Parquet and Arrow exports need pyarrow, NDJSON works without it
+    pa = pq = None
+
+# Columns and column types of each exportable table
+TABLES = {
+    'channel_videos': (
+        ('video_id', 'string'),
+        ('title', 'string'),
+        ('published_at', 'timestamp'),
+        ('duration', 'string'),
+        ('views', 'int64'),
+        ('likes', 'int64'),
+        ('comments', 'int64'),
+        ('engagement_rate', 'double'),
+    ),
+    'comments': (
+        ('comment_id', 'string'),
+        ('video_id', 'string'),
+        ('author', 'string'),
+        ('text', 'string'),
+        ('published_at', 'timestamp'),
+        ('like_count', 'int64'),
+        ('polarity', 'double'),
+        ('sentiment', 'string'),
+    ),
+    'snapshots': (
+        ('video_id', 'string'),
+        ('timestamp', 'timestamp'),
+        ('views', 'int64'),
+        ('likes', 'int64'),
+        ('comments', 'int64'),
+    ),
+}
+
+FORMATS = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+    'ndjson': 'application/x-ndjson',
+}
+FILE_EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrows', 'ndjson': 'ndjson'}
+
+# Rows buffered into each Parquet row group; bounds memory per export
+PARQUET_ROW_GROUP_SIZE = 10000
+
+
+def default_format():
+    return 'parquet' if pa is not None else 'ndjson'
+
+
+def check_format(fmt):
+    """Raise ValueError unless fmt is a format that can be written here."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}', use one of: {', '.join(FORMATS)}")
+    if fmt != 'ndjson' and pa is None:
+        raise ValueError(f'Exporting {fmt} requires pyarrow, install it or use ndjson')
+
+
+def channel_video_batches(service, channel_url, max_results=None):
+    """Yield a channel's uploads as column batches, one playlist page at a time."""
+    channel_id = service.extract_channel_id(channel_url)
+    for videos in service.iter_channel_video_pages(channel_id, max_results):
+        yield {
+            'video_id': [video.id for video in videos],
+            'title': [video.title for video in videos],
+            'published_at': [video.published_at for video in videos],
+            'duration': [video.duration for video in videos],
+            'views': [video.views for video in videos],
+            'likes': [video.likes for video in videos],
+            'comments': [video.comments for video in videos],
+            'engagement_rate': [engagement_rate(video.views, video.likes, video.comments) for video in videos],
+        }
+
+
+def comment_batches(service, video_url, max_comments=None, time_budget=None):
+    """Yield a video's scored comments as column batches, one comment page at a time."""
+    video_id = service.extract_video_id(video_url)
+    for comments in service.iter_comment_pages(video_url, max_comments, time_budget):
+        if not comments:
+            continue
+        polarities = service.sentiment_engine.polarities([comment.text for comment in comments])
+        yield {
+            'comment_id': [comment.id for comment in comments],
+            'video_id': [video_id] * len(comments),
+            'author': [comment.author for comment in comments],
+            'text': [comment.text for comment in comments],
+            'published_at': [parse_timestamp(comment.published_at) for comment in comments],
+            'like_count': [comment.like_count for comment in comments],
+            'polarity': polarities,
+            'sentiment': [
+                'positive' if polarity > POSITIVE_THRESHOLD
+                else 'negative' if polarity < NEGATIVE_THRESHOLD
+                else 'neutral'
+                for polarity in polarities.tolist()
+            ],
+        }
+
+
+def snapshot_batches(service, video_ids, start=None, end=None):
+    """Yield the recorded statistics snapshots of videos as column batches, one video at a time."""
+    if service.snapshot_store is None:
+        raise ValueError('Snapshot store is disabled')
+    for video_id in video_ids:
+        snapshots = service.snapshot_store.series(video_id, start, end)
+        if len(snapshots) == 0:
+            continue
+        yield {
+            'video_id': [video_id] * len(snapshots),
+            # Epoch seconds, passed to pyarrow without converting row by row
+            'timestamp': snapshots['timestamp'],
+            'views': snapshots['views'],
+            'likes': snapshots['likes'],
+            'comments': snapshots['comments'],
+        }
+
+
+def arrow_schema(table):
+    return pa.schema([
+        (name, pa.timestamp('s', tz='UTC') if kind == 'timestamp' else pa.type_for_alias(kind))
+        for name, kind in TABLES[table]
+    ])
+
+
+def iter_export(batches, table, fmt):
+    """Encode column batches of a table in the given format, yielding the output in chunks.
+
+    Only one batch (one Parquet row group at most) is held in memory at a
+    time, so exports of large channels and comment sections stream through.
+    """
+    check_format(fmt)
+    if fmt == 'ndjson':
+        yield from _iter_ndjson(batches, table)
+        return
+
+    schema = arrow_schema(table)
+    sink = _ChunkSink()
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+    pending = []
+    pending_rows = 0
+    for batch in batches:
+        record_batch = pa.RecordBatch.from_pydict(batch, schema=schema)
+        if fmt == 'arrow':
+            writer.write_batch(record_batch)
+        else:
+            # Many small row groups make slow Parquet files, so collect a few pages first
+            pending.append(record_batch)
+            pending_rows += record_batch.num_rows
+            if pending_rows >= PARQUET_ROW_GROUP_SIZE:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema))
+                pending = []
+                pending_rows = 0
+        chunk = sink.drain()
+        if chunk:
+            yield chunk
+
+    if pending:
+        writer.write_table(pa.Table.from_batches(pending, schema=schema))
+    writer.close()
+    yield sink.drain()
+
+
+def _iter_ndjson(batches, table):
+    columns = TABLES[table]
+    for batch in batches:
+        values = [_json_values(batch[name], kind) for name, kind in columns]
+        names = [name for name, _ in columns]
+        yield ''.join(json.dumps(dict(zip(names, row))) + '\n' for row in zip(*values)).encode()
+
+
+def _json_values(values, kind):
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    if kind == 'timestamp':
+        return [
+            format_timestamp(value if isinstance(value, datetime) else datetime.utcfromtimestamp(value))
+            for value in values
+        ]
+    return values
+
+
+class _ChunkSink:
+    """Write-only file object that hands out what a pyarrow writer has written so far."""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
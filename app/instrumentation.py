@@ -0,0 +1,249 @@
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+METRIC_PREFIX = 'tube_analyzer_'
+# Name: (type, help) of every metric exported in the Prometheus text format
+METRICS = {
+    'stage_seconds': ('histogram', 'Time spent in each stage of an analysis.'),
+    'api_request_seconds': ('histogram', 'Time of YouTube API requests, including quota waits and retries.'),
+    'api_response_bytes_total': ('counter', 'Size of YouTube API response payloads.'),
+    'http_request_seconds': ('histogram', 'Time to handle a request, per route and status code.'),
+}
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+DEFAULT_PROFILE_INTERVAL = 0.005
+MAX_STACK_DEPTH = 100
+
+# Stage timings of the request being served, None unless a breakdown was asked for
+current_timings = contextvars.ContextVar('current_timings', default=None)
+# Profiler sampling the request being served, if its route is profiled
+current_profiler = contextvars.ContextVar('current_profiler', default=None)
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count of observed values."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Metrics:
+    """Process-wide histograms and counters, keyed by metric name and labels."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def increment(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[(name, tuple(sorted(labels.items())))] += value
+
+    def summary(self):
+        """Get the count and total seconds of every histogram, for the JSON metrics."""
+        with self._lock:
+            return {
+                name + _format_labels(labels): {'count': histogram.count, 'seconds': round(histogram.sum, 3)}
+                for (name, labels), histogram in sorted(self._histograms.items())
+            }
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            lines = []
+            for name, (kind, help_text) in METRICS.items():
+                full_name = METRIC_PREFIX + name
+                lines.append(f'# HELP {full_name} {help_text}')
+                lines.append(f'# TYPE {full_name} {kind}')
+                if kind == 'counter':
+                    for (counter_name, labels), value in sorted(self._counters.items()):
+                        if counter_name == name:
+                            lines.append(f'{full_name}{_format_labels(labels)} {value}')
+                    continue
+                for (histogram_name, labels), histogram in sorted(self._histograms.items()):
+                    if histogram_name != name:
+                        continue
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{full_name}_bucket{_format_labels(labels + (("le", str(bound)),))} {count}')
+                    lines.append(f'{full_name}_bucket{_format_labels(labels + (("le", "+Inf"),))} {histogram.count}')
+                    lines.append(f'{full_name}_sum{_format_labels(labels)} {histogram.sum}')
+                    lines.append(f'{full_name}_count{_format_labels(labels)} {histogram.count}')
+            return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def span(stage):
+    """Time a block as one stage of the current analysis."""
+    profiler = current_profiler.get()
+    if profiler is not None:
+        profiler.add_thread()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe('stage_seconds', elapsed, stage=stage)
+        timings = current_timings.get()
+        if timings is not None:
+            timings.append((stage, elapsed, None))
+        if profiler is not None:
+            profiler.remove_thread()
+
+
+def record_api_call(method_id, elapsed, payload_bytes):
+    """Account one executed API request, which returns one page of results."""
+    metrics.observe('api_request_seconds', elapsed, method=method_id)
+    metrics.increment('api_response_bytes_total', payload_bytes, method=method_id)
+    timings = current_timings.get()
+    if timings is not None:
+        timings.append(('api.' + method_id.split('.')[1], elapsed, payload_bytes))
+
+
+def server_timing(timings, total):
+    """Format stage timings as a Server-Timing header value.
+
+    Repeated stages, such as the pages of an API walk, are summed into one
+    entry that says how many there were. Stages run concurrently, so their
+    durations can add up to more than the total.
+    """
+    stages = {}
+    for stage, elapsed, payload_bytes in timings:
+        entry = stages.setdefault(stage, [0.0, 0, None])
+        entry[0] += elapsed
+        entry[1] += 1
+        if payload_bytes is not None:
+            entry[2] = (entry[2] or 0) + payload_bytes
+
+    entries = []
+    for stage, (elapsed, count, payload_bytes) in stages.items():
+        description = []
+        if stage.startswith('api.'):
+            description.append(f'{count} page' + ('s' if count > 1 else ''))
+        elif count > 1:
+            description.append(f'{count} calls')
+        if payload_bytes is not None:
+            description.append(f'{payload_bytes / 1024:.1f} KB')
+        entry = f'{stage};dur={elapsed * 1000:.1f}'
+        if description:
+            entry += ';desc="' + ', '.join(description) + '"'
+        entries.append(entry)
+    entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler for the requests of one route.
+
+    While a profiled request is being served, the stacks of its thread and
+    of the pool threads working for it are sampled every `interval`
+    seconds. Stacks are counted in the folded format flame graph tools read.
+    """
+
+    def __init__(self, route, interval=DEFAULT_PROFILE_INTERVAL):
+        self.route = route
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._threads = Counter()
+        self._sampler = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Create the profiler for the endpoint named by PROFILE_ROUTE, or None when unset."""
+        route = os.getenv('PROFILE_ROUTE')
+        if not route:
+            return None
+        return cls(route, interval=float(os.getenv('PROFILE_INTERVAL', DEFAULT_PROFILE_INTERVAL)))
+
+    def begin(self):
+        """Start sampling the current request and the pool threads it hands work to."""
+        current_profiler.set(self)
+        self.add_thread()
+
+    def end(self):
+        self.remove_thread()
+        current_profiler.set(None)
+
+    def add_thread(self):
+        with self._lock:
+            self._threads[threading.get_ident()] += 1
+            if self._sampler is None:
+                self._sampler = threading.Thread(target=self._sample, name='sampling-profiler', daemon=True)
+                self._sampler.start()
+
+    def remove_thread(self):
+        ident = threading.get_ident()
+        with self._lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def _sample(self):
+        while True:
+            with self._lock:
+                if not self._threads:
+                    self._sampler = None
+                    return
+                threads = list(self._threads)
+            frames = sys._current_frames()
+            stacks = [_folded_stack(frames[ident]) for ident in threads if ident in frames]
+            with self._lock:
+                self.stacks.update(stacks)
+                self.samples += 1
+            time.sleep(self.interval)
+
+    def folded(self):
+        """Get the sampled stacks as "frame;frame;frame count" lines, root frame first."""
+        with self._lock:
+            return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples = 0
+
+
+def _folded_stack(frame):
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
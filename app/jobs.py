@@ -0,0 +1,98 @@
+import contextvars
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Finished jobs are kept this long for clients to collect their results
+DEFAULT_RESULT_TTL = 10 * 60
+
+
+class Job:
+    """A background analysis and what is known about it so far."""
+
+    def __init__(self, key):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.status = 'queued'
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def update(self, **progress):
+        """Merge progress fields reported by the running analysis."""
+        with self._lock:
+            self.progress.update(progress)
+
+    def to_dict(self):
+        with self._lock:
+            job = {
+                'job_id': self.id,
+                'status': self.status,
+                'progress': dict(self.progress),
+                'submitted_at': self.submitted_at
+            }
+            if self.status == 'done':
+                job['result'] = self.result
+            if self.status == 'failed':
+                job['error'] = self.error
+            return job
+
+
+class JobManager:
+    """Runs analyses in a worker pool, sharing one job between identical requests."""
+
+    def __init__(self, max_workers=4, result_ttl=DEFAULT_RESULT_TTL):
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analysis-job')
+        self._jobs = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(max_workers=int(os.getenv('JOB_WORKERS', 4)))
+
+    def submit(self, key, analysis):
+        """Start analysis(job) in the background, or join the in-flight job with the same key."""
+        with self._lock:
+            self._expire()
+            job = self._in_flight.get(key)
+            if job is not None:
+                return job
+
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+        self._executor.submit(contextvars.copy_context().run, self._run, job, analysis)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, analysis):
+        job.status = 'running'
+        try:
+            job.result = analysis(job)
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._in_flight.pop(job.key, None)
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,175 @@
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from googleapiclient.errors import HttpError
+
+# Quota units charged per call, see https://developers.google.com/youtube/v3/determine_quota_cost
+METHOD_COSTS = {
+    'youtube.search.list': 100,
+}
+DEFAULT_METHOD_COST = 1
+DEFAULT_DAILY_LIMIT = 10000
+
+# Error reasons that clear up by waiting; "quotaExceeded" only clears with the daily reset
+RATE_LIMIT_REASONS = ('rateLimitExceeded', 'userRateLimitExceeded')
+QUOTA_REASONS = ('quotaExceeded', 'dailyLimitExceeded')
+
+# The API quota resets at midnight Pacific time, daylight saving time included
+QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+
+# Route whose request is being served, used to attribute quota spend
+current_route = contextvars.ContextVar('current_route', default=None)
+
+
+class QuotaExceededError(Exception):
+    """The daily YouTube Data API quota is used up."""
+
+
+def cost_for(method_id):
+    """Get the quota units charged for one call of an API method."""
+    return METHOD_COSTS.get(method_id, DEFAULT_METHOD_COST)
+
+
+def error_reason(error):
+    """Get the reason code of an API error, such as "quotaExceeded"."""
+    try:
+        return json.loads(error.content)['error']['errors'][0]['reason']
+    except (ValueError, KeyError, IndexError, TypeError):
+        return None
+
+
+def _quota_day():
+    return datetime.now(QUOTA_TIMEZONE).date()
+
+
+class QuotaScheduler:
+    """Central gate for API calls that accounts for quota cost and rate limits.
+
+    Calls draw their unit cost from a token bucket refilled at `rate` units
+    per second. Waiting calls are served cheapest first, so a burst of
+    100-unit searches cannot hold up 1-unit lookups. Rate limit errors are
+    retried with exponential backoff, and calls are refused with
+    QuotaExceededError once the daily limit is spent or the API reports it is.
+    """
+
+    def __init__(self, daily_limit=DEFAULT_DAILY_LIMIT, rate=10.0, burst=500,
+                 max_retries=3, backoff=0.5):
+        self.daily_limit = daily_limit
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.units_by_method = Counter()
+        self.calls_by_method = Counter()
+        self.units_by_route = Counter()
+        self.retries = Counter()
+        self._day = _quota_day()
+        self._spent_today = 0
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._waiting = []
+        self._order = itertools.count()
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_env(cls):
+        """Create the scheduler configured by the QUOTA_* environment variables."""
+        return cls(
+            daily_limit=int(os.getenv('QUOTA_DAILY_LIMIT', DEFAULT_DAILY_LIMIT)),
+            rate=float(os.getenv('QUOTA_RATE', 10.0)),
+            burst=int(os.getenv('QUOTA_BURST', 500))
+        )
+
+    def run(self, method_id, call):
+        """Run an API call once quota and rate limits allow, retrying on rate limit errors."""
+        cost = cost_for(method_id)
+        for attempt in itertools.count():
+            self._acquire(cost)
+            self._account(method_id, cost)
+            try:
+                return call()
+            except HttpError as e:
+                reason = error_reason(e)
+                if e.resp.status == 403 and reason in QUOTA_REASONS:
+                    # The API says the quota is gone, trust it until the daily reset
+                    with self._cond:
+                        self._spent_today = max(self._spent_today, self.daily_limit)
+                    raise QuotaExceededError('YouTube API daily quota exceeded')
+                retryable = e.resp.status == 429 or (e.resp.status == 403 and reason in RATE_LIMIT_REASONS)
+                if not retryable or attempt >= self.max_retries:
+                    raise
+                with self._cond:
+                    self.retries[method_id] += 1
+                time.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+    def _acquire(self, cost):
+        with self._cond:
+            self._roll_day()
+            if self._spent_today + cost > self.daily_limit:
+                raise QuotaExceededError('YouTube API daily quota exceeded')
+
+            entry = (cost, next(self._order))
+            heapq.heappush(self._waiting, entry)
+            try:
+                while True:
+                    self._refill()
+                    is_next = self._waiting[0] == entry
+                    # Calls costing more than the bucket holds go through once it is full
+                    if is_next and self._tokens >= min(cost, self.burst):
+                        heapq.heappop(self._waiting)
+                        self._tokens -= cost
+                        self._cond.notify_all()
+                        return
+                    timeout = (min(cost, self.burst) - self._tokens) / self.rate if is_next else None
+                    self._cond.wait(timeout)
+            except BaseException:
+                if entry in self._waiting:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def _roll_day(self):
+        day = _quota_day()
+        if day != self._day:
+            self._day = day
+            self._spent_today = 0
+
+    def _account(self, method_id, cost):
+        with self._cond:
+            self._roll_day()
+            self._spent_today += cost
+            self.units_by_method[method_id] += cost
+            self.calls_by_method[method_id] += 1
+            self.units_by_route[current_route.get() or 'none'] += cost
+
+    def metrics(self):
+        """Get quota spend per method and route along with the remaining daily budget."""
+        with self._cond:
+            self._roll_day()
+            self._refill()
+            return {
+                'daily_limit': self.daily_limit,
+                'spent_today': self._spent_today,
+                'remaining_today': max(self.daily_limit - self._spent_today, 0),
+                'tokens_available': round(self._tokens, 1),
+                'waiting_calls': len(self._waiting),
+                'units_by_method': dict(self.units_by_method),
+                'calls_by_method': dict(self.calls_by_method),
+                'units_by_route': dict(self.units_by_route),
+                'retries_by_method': dict(self.retries)
+            }
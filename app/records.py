@@ -0,0 +1,156 @@
+from datetime import datetime
+
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+def parse_timestamp(value):
+    """Parse an API timestamp such as 2024-01-31T12:00:00Z into a naive UTC datetime."""
+    # Several times faster than strptime, which dominates ingesting large channels
+    return datetime.fromisoformat(value.rstrip('Z'))
+
+
+def format_timestamp(value):
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+class VideoRecord:
+    """The fields of a video resource we use, with numbers and timestamps parsed once."""
+
+    __slots__ = ('id', 'title', 'description', 'published_at', 'duration', 'views', 'likes', 'comments', 'tags')
+
+    def __init__(self, id, title, published_at, views, likes, comments, description=None, duration=None,
+                 tags=()):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.tags = tags
+        self.published_at = published_at
+        self.duration = duration
+        self.views = views
+        self.likes = likes
+        self.comments = comments
+
+    @classmethod
+    def from_api(cls, video, keep_description=True):
+        """Build a record from a videos().list item.
+
+        Channel analyses leave the description out, it is the bulk of a
+        video resource and never used there.
+        """
+        snippet = video['snippet']
+        stats = video['statistics']
+        return cls(
+            video['id'],
+            snippet['title'],
+            parse_timestamp(snippet['publishedAt']),
+            int(stats.get('viewCount', 0)),
+            int(stats.get('likeCount', 0)),
+            int(stats.get('commentCount', 0)),
+            description=snippet['description'] if keep_description else None,
+            duration=video['contentDetails']['duration'],
+            tags=tuple(snippet.get('tags', ()))
+        )
+
+    def to_basic_metrics(self):
+        """Get the video details in the shape the /analyze-video response uses."""
+        return {
+            'title': self.title,
+            'description': self.description,
+            'publishedAt': format_timestamp(self.published_at),
+            'viewCount': str(self.views),
+            'likeCount': str(self.likes),
+            'commentCount': str(self.comments),
+            'duration': self.duration,
+            'tags': list(self.tags)
+        }
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'published_at': format_timestamp(self.published_at),
+            'views': self.views,
+            'likes': self.likes,
+            'comments': self.comments,
+            'duration': self.duration
+        }
+
+
+class ChannelRecord:
+    """The fields of a channel resource we use, with numbers parsed once."""
+
+    __slots__ = ('id', 'title', 'description', 'published_at', 'subscribers', 'video_count', 'views',
+                 'uploads_playlist_id')
+
+    def __init__(self, id, title, description, published_at, subscribers, video_count, views,
+                 uploads_playlist_id):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.published_at = published_at
+        self.subscribers = subscribers
+        self.video_count = video_count
+        self.views = views
+        self.uploads_playlist_id = uploads_playlist_id
+
+    @classmethod
+    def from_api(cls, channel):
+        """Build a record from a channels().list item."""
+        snippet = channel['snippet']
+        stats = channel['statistics']
+        return cls(
+            channel['id'],
+            snippet['title'],
+            snippet['description'],
+            # Channel creation times may carry fractional seconds, keep them as sent
+            snippet['publishedAt'],
+            int(stats.get('subscriberCount', 0)),
+            int(stats.get('videoCount', 0)),
+            int(stats.get('viewCount', 0)),
+            channel['contentDetails']['relatedPlaylists']['uploads']
+        )
+
+    def to_basic_info(self):
+        """Get the channel details in the shape the /analyze-channel response uses."""
+        return {
+            'title': self.title,
+            'description': self.description,
+            'publishedAt': self.published_at,
+            'subscriberCount': str(self.subscribers),
+            'videoCount': str(self.video_count),
+            'viewCount': str(self.views)
+        }
+
+
+class CommentRecord:
+    """A top-level comment of a comment thread."""
+
+    __slots__ = ('id', 'author', 'text', 'published_at', 'like_count')
+
+    def __init__(self, id, author, text, published_at, like_count):
+        self.id = id
+        self.author = author
+        self.text = text
+        self.published_at = published_at
+        self.like_count = like_count
+
+    @classmethod
+    def from_api(cls, item):
+        """Build a record from a commentThreads().list item."""
+        comment = item['snippet']['topLevelComment']['snippet']
+        return cls(
+            item['id'],
+            comment['authorDisplayName'],
+            comment['textDisplay'],
+            comment['publishedAt'],
+            comment['likeCount']
+        )
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'author': self.author,
+            'text': self.text,
+            'publishedAt': self.published_at,
+            'likeCount': self.like_count
+        }
@@ -1,39 +1,203 @@
-from flask import Blueprint, render_template, request, jsonify
-from app.youtube_service import YouTubeService
+import gzip
+import json
+import os
+import time
+from flask import Blueprint, Response, g, render_template, request, jsonify, stream_with_context, url_for
+from app import export, instrumentation
+from app.instrumentation import SamplingProfiler, current_timings, server_timing, span
+from app.jobs import JobManager
+from app.quota import current_route, QuotaExceededError
+from app.sentiment import SentimentAggregator
+from app.tag_index import TAG, KEYWORD, ORDER_COLUMNS
+from app.youtube_service import YouTubeService, DEFAULT_STREAM_MAX_COMMENTS, DEFAULT_STREAM_TIME_BUDGET, MAX_BULK_VIDEOS
 
 main_bp = Blueprint('main', __name__)
 youtube_service = YouTubeService()
+job_manager = JobManager.from_env()
+profiler = SamplingProfiler.from_env()
+
+# Send a Server-Timing header with the stage breakdown of every response
+SERVER_TIMING = os.getenv('SERVER_TIMING', '0') == '1'
+
+# How long browsers may reuse an analysis before revalidating it, in line
+# with how long the API cache keeps statistics
+ANALYSIS_MAX_AGE = 5 * 60
+# Smaller responses are not worth gzipping
+GZIP_MIN_BYTES = 1024
+# Values of a flag parameter that switch it on; anything else, such as 0 or false, is off
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+
+def parse_flag(value):
+    return value.strip().lower() in TRUE_VALUES
+
+@main_bp.before_request
+def track_route():
+    # Attribute API quota spent while serving this request to its route
+    current_route.set(request.endpoint)
+    g.request_start = time.perf_counter()
+    current_timings.set([] if SERVER_TIMING else None)
+    if profiler is not None and request.endpoint == profiler.route:
+        profiler.begin()
+        g.profiled = True
+
+@main_bp.after_request
+def record_request_time(response):
+    # Streamed responses are timed up to their first chunk
+    elapsed = time.perf_counter() - g.request_start
+    instrumentation.metrics.observe(
+        'http_request_seconds', elapsed, route=request.endpoint, status=response.status_code
+    )
+    timings = current_timings.get()
+    if timings is not None:
+        response.headers['Server-Timing'] = server_timing(timings, elapsed)
+    return response
+
+@main_bp.teardown_request
+def stop_profiling(error):
+    if g.get('profiled'):
+        profiler.end()
+
+@main_bp.route('/metrics')
+def metrics():
+    return jsonify({
+        'quota': youtube_service.scheduler.metrics(),
+        'api_calls': youtube_service.get_api_call_counts(),
+        'cache': youtube_service.get_cache_stats(),
+        'coalescing': youtube_service.get_coalescing_stats(),
+        'timings': instrumentation.metrics.summary()
+    })
+
+@main_bp.route('/metrics/prometheus')
+def prometheus_metrics():
+    return Response(instrumentation.metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@main_bp.route('/metrics/profile')
+def profile():
+    if profiler is None:
+        return jsonify({'error': 'Profiling is disabled, set PROFILE_ROUTE to enable it'}), 404
+    stacks = profiler.folded()
+    if request.args.get('reset', False, type=parse_flag):
+        profiler.reset()
+    return Response(stacks, mimetype='text/plain')
 
 @main_bp.route('/')
 def index():
     return render_template('index.html')
 
-@main_bp.route('/analyze-video', methods=['POST'])
+@main_bp.route('/analyze-video', methods=['GET', 'POST'])
 def analyze_video():
-    video_url = request.form.get('video_url')
+    video_url = request.values.get('video_url')
     if not video_url:
         return jsonify({'error': 'Video URL is required'}), 400
     
     try:
         # Get comprehensive video analysis
         video_data = youtube_service.get_video_performance(video_url)
-        return jsonify(video_data)
+        return cacheable_json(video_data)
+    except QuotaExceededError as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@main_bp.route('/analyze-channel', methods=['POST'])
+@main_bp.route('/analyze-videos', methods=['POST'])
+def analyze_videos():
+    # Accept a JSON body {"videos": [...]} or form fields holding URLs or IDs, one per line
+    if request.is_json:
+        body = request.get_json(silent=True)
+        videos = body.get('videos') if isinstance(body, dict) else None
+        if not isinstance(videos, list) or not all(isinstance(video, str) for video in videos):
+            return jsonify({'error': 'videos must be a list of video URLs or IDs'}), 400
+    else:
+        videos = [
+            line.strip()
+            for value in request.form.getlist('videos')
+            for line in value.splitlines() if line.strip()
+        ]
+    if not videos:
+        return jsonify({'error': 'At least one video URL or ID is required'}), 400
+    if len(videos) > MAX_BULK_VIDEOS:
+        return jsonify({'error': f'At most {MAX_BULK_VIDEOS} videos can be analyzed at once'}), 400
+    
+    try:
+        results = youtube_service.iter_videos_performance(videos)
+        # Start the fetches now, so errors raised up front still get a JSON response
+        first = next(results, None)
+    except QuotaExceededError as e:
+        return jsonify({'error': str(e)}), 429
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        if first is not None:
+            yield json.dumps(first) + '\n'
+        for entry in results:
+            yield json.dumps(entry) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@main_bp.route('/analyze-channel', methods=['GET', 'POST'])
 def analyze_channel():
-    channel_url = request.form.get('channel_url')
+    channel_url = request.values.get('channel_url')
     if not channel_url:
         return jsonify({'error': 'Channel URL is required'}), 400
     
     try:
+        if request.values.get('async', False, type=parse_flag):
+            return submit_channel_analysis(channel_url)
         # Get comprehensive channel analysis
-        channel_data = youtube_service.get_channel_analytics(channel_url)
-        return jsonify(channel_data)
+        channel_data = youtube_service.get_channel_analytics(
+            channel_url, full_history=request.values.get('full_history', False, type=parse_flag)
+        )
+        return cacheable_json(channel_data)
+    except QuotaExceededError as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def cacheable_json(data):
+    """Build a JSON response that clients can revalidate by its ETag, gzipped when they accept it.
+    
+    GET requests whose If-None-Match matches get an empty 304 instead. The
+    ETag is weak, since the same JSON is sent gzipped or not.
+    """
+    with span('serialize'):
+        response = jsonify(data)
+    response.add_etag(weak=True)
+    response.headers['Cache-Control'] = f'private, max-age={ANALYSIS_MAX_AGE}'
+    response.vary.add('Accept-Encoding')
+    response.make_conditional(request)
+    
+    if (response.status_code == 200 and request.accept_encodings['gzip']
+            and response.content_length >= GZIP_MIN_BYTES):
+        with span('compress'):
+            response.set_data(gzip.compress(response.get_data(), compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+def submit_channel_analysis(channel_url):
+    """Run a channel analysis as a background job and return its ID right away."""
+    # Identical requests for the same channel share one in-flight job
+    channel_id = youtube_service.extract_channel_id(channel_url)
+    full_history = request.values.get('full_history', False, type=parse_flag)
+    job = job_manager.submit(
+        ('channel', channel_id, full_history),
+        lambda job: youtube_service.get_channel_analytics(
+            channel_url, progress=job.update, full_history=full_history
+        )
+    )
+    return jsonify({
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': url_for('main.get_job', job_id=job.id)
+    }), 202
+
+@main_bp.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job.to_dict())
+
 @main_bp.route('/video-comments', methods=['POST'])
 def get_video_comments():
     video_url = request.form.get('video_url')
@@ -41,11 +205,47 @@ def get_video_comments():
         return jsonify({'error': 'Video URL is required'}), 400
     
     try:
+        if request.form.get('stream', False, type=parse_flag):
+            return stream_video_comments(video_url)
         comments = youtube_service.get_video_comments(video_url)
-        return jsonify(comments)
+        with span('serialize'):
+            return jsonify([comment.to_dict() for comment in comments])
+    except QuotaExceededError as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def stream_video_comments(video_url):
+    """Stream all comments as NDJSON, ending with a line holding their sentiment analysis."""
+    max_comments = request.form.get('max_comments', DEFAULT_STREAM_MAX_COMMENTS, type=int)
+    time_budget = request.form.get('time_budget', DEFAULT_STREAM_TIME_BUDGET, type=float)
+    error = comment_limits_error(max_comments, time_budget)
+    if error:
+        return jsonify({'error': error}), 400
+    # Validate the URL before the response starts, so errors still get a 500
+    youtube_service.extract_video_id(video_url)
+    
+    def generate():
+        aggregator = SentimentAggregator(youtube_service.sentiment_engine)
+        try:
+            for comments in youtube_service.iter_comment_pages(video_url, max_comments, time_budget):
+                aggregator.add(comments)
+                for comment in comments:
+                    yield json.dumps(comment.to_dict()) + '\n'
+        except Exception as e:
+            yield json.dumps({'error': str(e)}) + '\n'
+        yield json.dumps({'sentiment_analysis': aggregator.result()}) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def comment_limits_error(max_comments, time_budget):
+    """Get the error message for invalid comment paging limits, or None."""
+    if max_comments < 1:
+        return 'max_comments must be at least 1'
+    if time_budget is not None and time_budget <= 0:
+        return 'time_budget must be positive'
+    return None
+
 @main_bp.route('/video-analytics', methods=['POST'])
 def get_video_analytics():
     video_url = request.form.get('video_url')
@@ -55,5 +255,114 @@ def get_video_analytics():
     try:
         analytics = youtube_service.get_video_analytics(video_url)
         return jsonify(analytics)
+    except QuotaExceededError as e:
+        return jsonify({'error': str(e)}), 429
     except Exception as e:
-        return jsonify({'error': str(e)}), 500 
\ No newline at end of file
+        return jsonify({'error': str(e)}), 500
+
+@main_bp.route('/channel-tags', methods=['GET', 'POST'])
+def channel_tags():
+    channel_url = request.values.get('channel_url')
+    if not channel_url:
+        return jsonify({'error': 'Channel URL is required'}), 400
+    order_by = request.values.get('order_by', 'views')
+    if order_by not in ORDER_COLUMNS:
+        return jsonify({'error': f'order_by must be one of: {", ".join(ORDER_COLUMNS)}'}), 400
+    
+    return tag_index_response(lambda kind: youtube_service.get_channel_tag_analytics(
+        channel_url, kind, order_by,
+        limit=request.values.get('limit', 20, type=int),
+        min_videos=request.values.get('min_videos', 2, type=int)
+    ))
+
+@main_bp.route('/channel-tags/co-occurrence', methods=['GET', 'POST'])
+def channel_tag_co_occurrence():
+    channel_url = request.values.get('channel_url')
+    term = request.values.get('term')
+    if not channel_url or not term:
+        return jsonify({'error': 'Channel URL and term are required'}), 400
+    
+    return tag_index_response(lambda kind: youtube_service.get_tag_co_occurrence(
+        channel_url, term, kind, limit=request.values.get('limit', 20, type=int)
+    ))
+
+def tag_index_response(query):
+    """Run a tag index query for the term kind asked for by the kind parameter."""
+    if youtube_service.tag_index is None:
+        return jsonify({'error': 'The tag index is disabled'}), 503
+    kind = request.values.get('kind', TAG)
+    if kind not in (TAG, KEYWORD):
+        return jsonify({'error': f'kind must be {TAG} or {KEYWORD}'}), 400
+    
+    try:
+        return cacheable_json(query(kind))
+    except QuotaExceededError as e:
+        return jsonify({'error': str(e)}), 429
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@main_bp.route('/export/channel-videos', methods=['GET', 'POST'])
+def export_channel_videos():
+    channel_url = request.values.get('channel_url')
+    if not channel_url:
+        return jsonify({'error': 'Channel URL is required'}), 400
+    
+    max_results = request.values.get('max_results', type=int)
+    return export_response(
+        'channel_videos', lambda: export.channel_video_batches(youtube_service, channel_url, max_results)
+    )
+
+@main_bp.route('/export/comments', methods=['GET', 'POST'])
+def export_comments():
+    video_url = request.values.get('video_url')
+    if not video_url:
+        return jsonify({'error': 'Video URL is required'}), 400
+    
+    max_comments = request.values.get('max_comments', DEFAULT_STREAM_MAX_COMMENTS, type=int)
+    time_budget = request.values.get('time_budget', type=float)
+    error = comment_limits_error(max_comments, time_budget)
+    if error:
+        return jsonify({'error': error}), 400
+    return export_response(
+        'comments', lambda: export.comment_batches(youtube_service, video_url, max_comments, time_budget)
+    )
+
+@main_bp.route('/export/snapshots', methods=['GET', 'POST'])
+def export_snapshots():
+    videos = request.values.getlist('video')
+    if not videos:
+        return jsonify({'error': 'At least one video URL or ID is required'}), 400
+    
+    try:
+        video_ids = [youtube_service.to_video_id(video) for video in videos]
+    except (ValueError, KeyError):
+        return jsonify({'error': 'Invalid YouTube URL'}), 400
+    return export_response('snapshots', lambda: export.snapshot_batches(youtube_service, video_ids))
+
+def export_response(table, batches):
+    """Stream a table export in the format asked for by the format parameter."""
+    fmt = request.values.get('format', export.default_format())
+    try:
+        export.check_format(fmt)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        chunks = export.iter_export(batches(), table, fmt)
+        # Fetch the first page now, so errors raised up front still get a JSON response
+        first = next(chunks, b'')
+    except QuotaExceededError as e:
+        return jsonify({'error': str(e)}), 429
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    def generate():
+        yield first
+        yield from chunks
+    
+    filename = f'{table}.{export.FILE_EXTENSIONS[fmt]}'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=export.FORMATS[fmt],
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
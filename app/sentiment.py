@@ -0,0 +1,154 @@
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from app.instrumentation import span
+
+# Polarity above POSITIVE_THRESHOLD is positive, below NEGATIVE_THRESHOLD negative
+POSITIVE_THRESHOLD = 0.1
+NEGATIVE_THRESHOLD = -0.1
+
+# Batches smaller than this are scored in-process, since shipping them to
+# worker processes costs more than it saves
+MIN_PARALLEL_BATCH = 2000
+CHUNK_SIZE = 500
+
+# Number of most negative comments reported with the sentiment breakdown
+TOP_NEGATIVE_COMMENTS = 10
+
+
+def _score_texts(texts):
+    """Score texts with the pattern lexicon analyzer TextBlob uses by default."""
+    # Imported on first use, TextBlob pulls in NLTK and takes longer to import
+    # than the rest of the app together
+    from textblob.en import sentiment as pattern_sentiment
+
+    # Same polarity as TextBlob(text).sentiment.polarity, without building a
+    # TextBlob and a namedtuple class for every text
+    return [pattern_sentiment(text)[0] for text in texts]
+
+
+class SentimentEngine:
+    """Batched polarity scorer for comment texts."""
+
+    def warm_up(self):
+        """Load the scoring backend now instead of on the first batch."""
+        _score_texts(['warm up'])
+
+    def polarities(self, texts):
+        """Get the polarity of every text as a NumPy array."""
+        if not texts:
+            return np.zeros(0)
+
+        # Comments repeat a lot ("first", emoji-only replies), score each text once
+        with span('sentiment_scoring'):
+            unique_texts, inverse = np.unique(np.asarray(texts, dtype=object), return_inverse=True)
+            scores = np.asarray(self._score(list(unique_texts)), dtype=float)
+            return scores[inverse]
+
+    def _score(self, texts):
+        return _score_texts(texts)
+
+
+class ParallelSentimentEngine(SentimentEngine):
+    """Sentiment engine that spreads large batches across a process pool."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+
+    def _score(self, texts):
+        if len(texts) < MIN_PARALLEL_BATCH or self.workers == 1:
+            return _score_texts(texts)
+
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        chunks = [texts[start:start + CHUNK_SIZE] for start in range(0, len(texts), CHUNK_SIZE)]
+        scores = []
+        for chunk_scores in self._pool.map(_score_texts, chunks):
+            scores.extend(chunk_scores)
+        return scores
+
+
+class SentimentAggregator:
+    """Running sentiment breakdown fed one batch of comments at a time.
+
+    Only the counts and the most negative comments seen so far are kept, so
+    arbitrarily long comment streams are summarized in constant memory.
+    """
+
+    def __init__(self, engine, top_negative=TOP_NEGATIVE_COMMENTS):
+        self.engine = engine
+        self.top_negative = top_negative
+        self.positive = 0
+        self.negative = 0
+        self.neutral = 0
+        self._seen = 0
+        # Max-heap (by negated keys) of the most negative comments; on equal
+        # polarity the earlier comment wins, like a stable sort would keep it
+        self._most_negative = []
+
+    @property
+    def total(self):
+        return self.positive + self.negative + self.neutral
+
+    def add(self, comments):
+        """Score a batch of comments and fold it into the running totals."""
+        if not comments:
+            return
+        polarities = self.engine.polarities([comment.text for comment in comments])
+        self.positive += int(np.count_nonzero(polarities > POSITIVE_THRESHOLD))
+        negative_indexes = np.flatnonzero(polarities < NEGATIVE_THRESHOLD)
+        self.negative += len(negative_indexes)
+        self.neutral = self._seen + len(comments) - self.positive - self.negative
+
+        for i in negative_indexes:
+            polarity = float(polarities[i])
+            key = (-polarity, -(self._seen + int(i)))
+            if len(self._most_negative) < self.top_negative:
+                heapq.heappush(self._most_negative, (key, comments[i]))
+            elif key > self._most_negative[0][0]:
+                heapq.heapreplace(self._most_negative, (key, comments[i]))
+        self._seen += len(comments)
+
+    def result(self):
+        """Get the sentiment breakdown of all comments added so far."""
+        total = self.total
+        if not total:
+            return {
+                'positive': 0,
+                'negative': 0,
+                'neutral': 0,
+                'total_comments': 0,
+                'negative_comments': []
+            }
+
+        most_negative = sorted(self._most_negative, key=lambda entry: entry[0], reverse=True)
+        return {
+            'positive': (self.positive / total) * 100,
+            'negative': (self.negative / total) * 100,
+            'neutral': (self.neutral / total) * 100,
+            'total_comments': total,
+            'negative_comments': [
+                {
+                    'text': comment.text,
+                    'author': comment.author,
+                    'polarity': -key[0],
+                    'published_at': comment.published_at
+                }
+                for key, comment in most_negative
+            ]
+        }
+
+
+def create_engine():
+    """Create the sentiment engine selected by the SENTIMENT_ENGINE environment variable."""
+    engine_name = os.getenv('SENTIMENT_ENGINE', 'batch')
+    if engine_name == 'batch':
+        return SentimentEngine()
+    if engine_name == 'parallel':
+        workers = os.getenv('SENTIMENT_WORKERS')
+        return ParallelSentimentEngine(int(workers) if workers else None)
+    raise ValueError(f'Unknown sentiment engine: {engine_name}')
@@ -0,0 +1,60 @@
+import threading
+from collections import Counter
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is still running wait for it and get the same result or exception.
+    """
+
+    def __init__(self):
+        self.executed = Counter()
+        self.coalesced = Counter()
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Run fn() for key, or wait for the identical call already in flight."""
+        kind = key[0] if isinstance(key, tuple) else key
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed[kind] += 1
+            else:
+                self.coalesced[kind] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        """Get executed and coalesced call counts per kind of key."""
+        with self._lock:
+            return {
+                'executed': dict(self.executed),
+                'coalesced': dict(self.coalesced)
+            }
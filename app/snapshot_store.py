@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+# One fixed-size record per snapshot, appended to a file per video
+SNAPSHOT_DTYPE = np.dtype([
+    ('timestamp', '<i8'),
+    ('views', '<i8'),
+    ('likes', '<i8'),
+    ('comments', '<i8'),
+])
+SECONDS_PER_DAY = 24 * 60 * 60
+
+# Snapshots closer together than this are not worth storing
+DEFAULT_MIN_INTERVAL = 60 * 60
+
+
+class SnapshotStore:
+    """Columnar time series of view, like and comment counts per video.
+
+    Each video gets an append-only binary file of SNAPSHOT_DTYPE records
+    that is memory-mapped for queries, so only the series being queried is
+    ever paged in, however many videos are tracked.
+    """
+
+    def __init__(self, directory, min_interval=DEFAULT_MIN_INTERVAL):
+        self.directory = directory
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Create the store configured by SNAPSHOT_DIR, or None when disabled."""
+        directory = os.getenv('SNAPSHOT_DIR', os.path.join('data', 'snapshots'))
+        if directory == 'none':
+            return None
+        min_interval = int(os.getenv('SNAPSHOT_MIN_INTERVAL', DEFAULT_MIN_INTERVAL))
+        return cls(directory, min_interval=min_interval)
+
+    def _path(self, video_id):
+        # Shard by ID prefix to keep directories small with many tracked videos
+        return os.path.join(self.directory, video_id[:2], f'{video_id}.bin')
+
+    def record(self, video_id, views, likes, comments, timestamp=None, min_interval=None):
+        """Append a snapshot, unless the previous one is less than min_interval old.
+
+        min_interval defaults to the store's; callers that already space their
+        refreshes, like the background tracker, can pass a shorter one.
+        """
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        min_interval = self.min_interval if min_interval is None else min_interval
+        path = self._path(video_id)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'ab+') as f:
+                size = f.tell()
+                if size >= SNAPSHOT_DTYPE.itemsize:
+                    f.seek(size - SNAPSHOT_DTYPE.itemsize)
+                    last = np.frombuffer(f.read(SNAPSHOT_DTYPE.itemsize), dtype=SNAPSHOT_DTYPE)[0]
+                    if timestamp - last['timestamp'] < min_interval:
+                        return False
+                record = np.array([(timestamp, views, likes, comments)], dtype=SNAPSHOT_DTYPE)
+                f.write(record.tobytes())
+        return True
+
+    def series(self, video_id, start=None, end=None):
+        """Get the snapshots of a video taken within [start, end) as a structured array."""
+        path = self._path(video_id)
+        if not os.path.exists(path) or os.path.getsize(path) < SNAPSHOT_DTYPE.itemsize:
+            return np.zeros(0, dtype=SNAPSHOT_DTYPE)
+
+        # Ignore a trailing partial record left by an interrupted write
+        count = os.path.getsize(path) // SNAPSHOT_DTYPE.itemsize
+        snapshots = np.memmap(path, dtype=SNAPSHOT_DTYPE, mode='r', shape=(count,))
+        timestamps = snapshots['timestamp']
+        first = 0 if start is None else np.searchsorted(timestamps, start, side='left')
+        last = count if end is None else np.searchsorted(timestamps, end, side='left')
+        return np.array(snapshots[first:last])
+
+    def daily_series(self, video_id, start=None, end=None, max_points=None):
+        """Get the last snapshot of every day, thinned out evenly to at most max_points."""
+        snapshots = self.series(video_id, start, end)
+        if len(snapshots) == 0:
+            return snapshots
+
+        days = snapshots['timestamp'] // SECONDS_PER_DAY
+        last_of_day = np.append(np.flatnonzero(np.diff(days)), len(snapshots) - 1)
+        daily = snapshots[last_of_day]
+        if max_points is not None and len(daily) > max_points:
+            daily = daily[np.unique(np.linspace(0, len(daily) - 1, max_points).round().astype(int))]
+        return daily
+
+    def growth_rates(self, video_id, start=None, end=None):
+        """Get the average daily growth of each metric between the first and last snapshot in range."""
+        snapshots = self.series(video_id, start, end)
+        if len(snapshots) < 2:
+            return None
+
+        days = (snapshots['timestamp'][-1] - snapshots['timestamp'][0]) / SECONDS_PER_DAY
+        if days <= 0:
+            return None
+        return {
+            metric: round(float(snapshots[metric][-1] - snapshots[metric][0]) / days, 2)
+            for metric in ('views', 'likes', 'comments')
+        }
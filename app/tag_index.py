@@ -0,0 +1,212 @@
+import os
+import re
+import threading
+import time
+
+from app.channel_stats import engagement_rate
+from app.database import Database
+
+TAG = 'tag'
+KEYWORD = 'keyword'
+
+# Title and description words shorter than this are not indexed
+MIN_KEYWORD_LENGTH = 3
+STOPWORDS = frozenset(
+    'and the for you your with this that from are was were have has had not but all any can will '
+    'our out its just into about more what when who how why new get now one http https www com'.split()
+)
+WORD_PATTERN = re.compile(r'[^\W_]+')
+
+ORDER_COLUMNS = {
+    'views': 'average_views',
+    'engagement': 'average_engagement',
+    'videos': 'videos',
+}
+
+
+def extract_keywords(*texts):
+    """Get the distinct lowercase words of texts, leaving out short words, stopwords and numbers."""
+    words = set()
+    for text in texts:
+        words.update(WORD_PATTERN.findall(text.lower()))
+    # Descriptions repeat words a lot, so filter each distinct word once
+    return {
+        word for word in words
+        if len(word) >= MIN_KEYWORD_LENGTH and word not in STOPWORDS and not word.isdigit()
+    }
+
+
+def normalize_tag(tag):
+    """Normalize a tag, which YouTube matches case-insensitively."""
+    return ' '.join(tag.lower().split())
+
+
+class TagIndex:
+    """Persistent inverted index of video tags and title/description keywords per channel.
+
+    Every term maps to the videos carrying it, stored with their view and
+    engagement stats, so cross-video tag analytics are answered by SQLite
+    range scans instead of re-fetching and re-scanning a channel's videos.
+    Videos are re-indexed only when their etag changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = Database(
+            path,
+            'CREATE TABLE IF NOT EXISTS videos ('
+            '  video_id TEXT PRIMARY KEY, channel_id TEXT, etag TEXT, published_at TEXT,'
+            '  views INTEGER, likes INTEGER, comments INTEGER, engagement REAL);'
+            'CREATE TABLE IF NOT EXISTS postings ('
+            '  channel_id TEXT, kind TEXT, term TEXT, video_id TEXT,'
+            '  PRIMARY KEY (channel_id, kind, term, video_id)) WITHOUT ROWID;'
+            'CREATE INDEX IF NOT EXISTS postings_video ON postings (video_id, kind, term);'
+            'CREATE TABLE IF NOT EXISTS channel_syncs ('
+            '  channel_id TEXT PRIMARY KEY, synced_through TEXT, synced_at REAL);'
+        )
+
+    @property
+    def _conn(self):
+        return self._db.connection
+
+    @classmethod
+    def from_env(cls):
+        """Create the index configured by TAG_INDEX_PATH, or None when disabled."""
+        path = os.getenv('TAG_INDEX_PATH', os.path.join('data', 'tag_index.sqlite3'))
+        if path == 'none':
+            return None
+        return cls(path)
+
+    def add_videos(self, items):
+        """Index or re-index videos from raw videos().list items."""
+        if not items:
+            return
+        placeholders = ','.join('?' * len(items))
+        with self._lock:
+            known = dict(self._conn.execute(
+                f'SELECT video_id, etag FROM videos WHERE video_id IN ({placeholders})',
+                [item['id'] for item in items]
+            ).fetchall())
+        changed = [item for item in items if item.get('etag') is None or known.get(item['id']) != item['etag']]
+        if not changed:
+            return
+
+        videos = []
+        postings = []
+        for item in changed:
+            snippet = item['snippet']
+            stats = item.get('statistics', {})
+            views = int(stats.get('viewCount', 0))
+            likes = int(stats.get('likeCount', 0))
+            comments = int(stats.get('commentCount', 0))
+            channel_id = snippet['channelId']
+            videos.append((
+                item['id'], channel_id, item.get('etag'), snippet['publishedAt'],
+                views, likes, comments, engagement_rate(views, likes, comments)
+            ))
+            tags = {normalize_tag(tag) for tag in snippet.get('tags', ())}
+            keywords = extract_keywords(snippet['title'], snippet.get('description', ''))
+            postings.extend((channel_id, TAG, tag, item['id']) for tag in tags if tag)
+            postings.extend((channel_id, KEYWORD, keyword, item['id']) for keyword in keywords)
+
+        with self._lock, self._conn:
+            self._conn.executemany('DELETE FROM postings WHERE video_id = ?', [(video[0],) for video in videos])
+            self._conn.executemany('INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?, ?, ?, ?, ?)', videos)
+            self._conn.executemany('INSERT OR IGNORE INTO postings VALUES (?, ?, ?, ?)', postings)
+
+    def get_sync(self, channel_id):
+        """Check whether a channel's upload history has been synced, and up to which upload.
+
+        Returns (synced, synced_through), where synced_through is the publish
+        time of the newest upload a sync walked, as sent by the API.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT synced_through FROM channel_syncs WHERE channel_id = ?', (channel_id,)
+            ).fetchone()
+        return row is not None, row[0] if row else None
+
+    def mark_synced(self, channel_id, synced_through):
+        """Record that every upload of the channel up to synced_through has been indexed.
+
+        Videos indexed outside a sync, such as single video analyses, do not
+        move this mark, so a sync never skips uploads older than them.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO channel_syncs VALUES (?, ?, ?)',
+                (channel_id, synced_through, time.time())
+            )
+
+    def top_terms(self, channel_id, kind=TAG, order_by='views', limit=20, min_videos=2):
+        """Get the terms of a channel's videos ranked by average views, engagement or video count."""
+        if order_by not in ORDER_COLUMNS:
+            raise ValueError(f'Unknown order: {order_by}')
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT p.term, COUNT(*) AS videos, AVG(v.views) AS average_views,'
+                '  AVG(v.engagement) AS average_engagement, SUM(v.views) '
+                'FROM postings p JOIN videos v ON v.video_id = p.video_id '
+                'WHERE p.channel_id = ? AND p.kind = ? '
+                'GROUP BY p.term HAVING COUNT(*) >= ? '
+                f'ORDER BY {ORDER_COLUMNS[order_by]} DESC, p.term LIMIT ?',
+                (channel_id, kind, min_videos, limit)
+            ).fetchall()
+        return [
+            {
+                'term': term,
+                'videos': videos,
+                'average_views': round(average_views, 1),
+                'average_engagement_rate': round(average_engagement, 3),
+                'total_views': total_views
+            }
+            for term, videos, average_views, average_engagement, total_views in rows
+        ]
+
+    def co_occurring(self, channel_id, term, kind=TAG, limit=20):
+        """Get the terms most often found on the same videos as term, with their share of its videos."""
+        term = normalize_tag(term)
+        with self._lock:
+            total = self._conn.execute(
+                'SELECT COUNT(*) FROM postings WHERE channel_id = ? AND kind = ? AND term = ?',
+                (channel_id, kind, term)
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                'SELECT other.term, COUNT(*) AS videos '
+                'FROM postings p JOIN postings other '
+                '  ON other.video_id = p.video_id AND other.kind = p.kind AND other.term != p.term '
+                'WHERE p.channel_id = ? AND p.kind = ? AND p.term = ? '
+                'GROUP BY other.term ORDER BY videos DESC, other.term LIMIT ?',
+                (channel_id, kind, term, limit)
+            ).fetchall()
+        return {
+            'term': term,
+            'videos': total,
+            'co_occurring': [
+                {'term': other, 'videos': videos, 'share': round(videos / total, 3)}
+                for other, videos in rows
+            ]
+        }
+
+    def channel_stats(self, channel_id):
+        """Get how many videos and distinct terms of a channel are indexed."""
+        with self._lock:
+            videos = self._conn.execute(
+                'SELECT COUNT(*) FROM videos WHERE channel_id = ?', (channel_id,)
+            ).fetchone()[0]
+            terms = dict(self._conn.execute(
+                'SELECT kind, COUNT(DISTINCT term) FROM postings WHERE channel_id = ? GROUP BY kind',
+                (channel_id,)
+            ).fetchall())
+            synced = self._conn.execute(
+                'SELECT synced_through, synced_at FROM channel_syncs WHERE channel_id = ?', (channel_id,)
+            ).fetchone()
+        return {
+            'indexed_videos': videos,
+            'distinct_tags': terms.get(TAG, 0),
+            'distinct_keywords': terms.get(KEYWORD, 0),
+            'complete': synced is not None,
+            'synced_through': synced[0] if synced else None,
+            'synced_at': synced[1] if synced else None
+        }
@@ -0,0 +1,163 @@
+import os
+import threading
+import time
+from datetime import timezone
+
+from googleapiclient.errors import HttpError
+
+from app.database import Database
+from app.quota import QuotaExceededError
+
+# How often a video is refreshed depending on its age: fresh uploads move fast
+VIDEO_REFRESH_INTERVALS = (
+    (2 * 24 * 60 * 60, 15 * 60),
+    (7 * 24 * 60 * 60, 60 * 60),
+    (30 * 24 * 60 * 60, 6 * 60 * 60),
+)
+OLD_VIDEO_REFRESH_INTERVAL = 24 * 60 * 60
+# Refreshes are already spaced by the intervals above, so every one of them is
+# kept as a snapshot; the slack absorbs API latency between two passes
+SNAPSHOT_MIN_INTERVAL = VIDEO_REFRESH_INTERVALS[0][1] - 60
+CHANNEL_REFRESH_INTERVAL = 6 * 60 * 60
+# Items due in one pass are refreshed in groups of this many, one API call each
+REFRESH_BATCH_SIZE = 50
+MAX_ITEMS_PER_PASS = 50 * REFRESH_BATCH_SIZE
+
+
+def video_refresh_interval(published_at, now):
+    """Get how long to wait before refreshing a video published at published_at."""
+    if published_at is None:
+        return VIDEO_REFRESH_INTERVALS[0][1]
+    age = now - published_at
+    for max_age, interval in VIDEO_REFRESH_INTERVALS:
+        if age < max_age:
+            return interval
+    return OLD_VIDEO_REFRESH_INTERVAL
+
+
+class Watchlist:
+    """Videos and channels whose statistics are refreshed in the background."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = Database(
+            path,
+            'CREATE TABLE IF NOT EXISTS watchlist ('
+            'kind TEXT, item_id TEXT, published_at REAL, next_due REAL, last_refreshed REAL,'
+            'PRIMARY KEY (kind, item_id));'
+            'CREATE INDEX IF NOT EXISTS watchlist_due ON watchlist (next_due);',
+            autocommit=True
+        )
+
+    @property
+    def _conn(self):
+        return self._db.connection
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv('WATCHLIST_PATH', os.path.join('data', 'watchlist.sqlite3')))
+
+    def add(self, kind, item_id):
+        """Watch a 'video' or 'channel', refreshing it on the next pass."""
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR IGNORE INTO watchlist VALUES (?, ?, NULL, 0, NULL)', (kind, item_id)
+            )
+
+    def due(self, now, limit=MAX_ITEMS_PER_PASS):
+        """Get (kind, item_id, published_at) of the items due for a refresh, most overdue first."""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT kind, item_id, published_at FROM watchlist '
+                'WHERE next_due <= ? ORDER BY next_due LIMIT ?',
+                (now, limit)
+            ).fetchall()
+
+    def reschedule(self, kind, item_id, next_due, published_at=None, refreshed_at=None):
+        with self._lock:
+            self._conn.execute(
+                'UPDATE watchlist SET next_due = ?, published_at = COALESCE(?, published_at),'
+                ' last_refreshed = COALESCE(?, last_refreshed) WHERE kind = ? AND item_id = ?',
+                (next_due, published_at, refreshed_at, kind, item_id)
+            )
+
+    def items(self):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT kind, item_id, next_due, last_refreshed FROM watchlist ORDER BY kind, item_id'
+            ).fetchall()
+
+
+class Tracker:
+    """Background refresher of watched videos and channels.
+
+    Due items are grouped into 50-ID videos().list and channels().list
+    calls through the service, which stores the results in its cache and
+    snapshot store. Videos are rescheduled by age, so fresh uploads are
+    polled often and old ones rarely.
+    """
+
+    def __init__(self, service, watchlist):
+        self.service = service
+        self.watchlist = watchlist
+
+    def refresh_due(self, now=None):
+        """Refresh every item that is due, returning how many were refreshed per kind."""
+        now = time.time() if now is None else now
+        due = self.watchlist.due(now)
+        video_ids = [item_id for kind, item_id, _ in due if kind == 'video']
+        channel_ids = [item_id for kind, item_id, _ in due if kind == 'channel']
+        refreshed = {'videos': 0, 'channels': 0, 'missing': 0}
+
+        for start in range(0, len(video_ids), REFRESH_BATCH_SIZE):
+            batch = video_ids[start:start + REFRESH_BATCH_SIZE]
+            videos = {
+                video.id: video
+                for video in self.service.refresh_videos(batch, snapshot_min_interval=SNAPSHOT_MIN_INTERVAL)
+            }
+            for video_id in batch:
+                video = videos.get(video_id)
+                if video is None:
+                    # Private or deleted, check back rarely
+                    self.watchlist.reschedule('video', video_id, now + OLD_VIDEO_REFRESH_INTERVAL)
+                    refreshed['missing'] += 1
+                    continue
+                published_at = video.published_at.replace(tzinfo=timezone.utc).timestamp()
+                self.watchlist.reschedule(
+                    'video', video_id, now + video_refresh_interval(published_at, now),
+                    published_at=published_at, refreshed_at=now
+                )
+                refreshed['videos'] += 1
+
+        for start in range(0, len(channel_ids), REFRESH_BATCH_SIZE):
+            batch = channel_ids[start:start + REFRESH_BATCH_SIZE]
+            found = {channel.id for channel in self.service.refresh_channels(batch)}
+            for channel_id in batch:
+                if channel_id in found:
+                    self.watchlist.reschedule(
+                        'channel', channel_id, now + CHANNEL_REFRESH_INTERVAL, refreshed_at=now
+                    )
+                    refreshed['channels'] += 1
+                else:
+                    self.watchlist.reschedule('channel', channel_id, now + OLD_VIDEO_REFRESH_INTERVAL)
+                    refreshed['missing'] += 1
+        return refreshed
+
+    def run(self, poll_interval=60, stop_event=None, log=print):
+        """Refresh due items every poll_interval seconds until stop_event is set."""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                refreshed = self.refresh_due()
+                if any(refreshed.values()):
+                    log(f"Refreshed {refreshed['videos']} videos, {refreshed['channels']} channels, "
+                        f"{refreshed['missing']} missing")
+            except QuotaExceededError as e:
+                log(f'Pausing refreshes: {e}')
+            except HttpError as e:
+                log(f'Refresh failed: {e}')
+            except Exception as e:
+                # Network errors and locked databases pass; keep the worker alive for the next poll
+                log(f'Refresh failed: {e!r}')
+            stop_event.wait(poll_interval)
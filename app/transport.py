@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import threading
+
+from googleapiclient.errors import HttpError
+
+from app.cache import request_key
+
+DEFAULT_FIXTURES_DIR = 'fixtures'
+
+
+class FixtureNotFoundError(Exception):
+    """No response was recorded for a request being replayed."""
+
+
+class LiveTransport:
+    """Sends API requests to YouTube."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _http(self):
+        """Get an HTTP connection owned by the current thread."""
+        # httplib2 connections are not thread-safe, so every thread gets its own
+        if not hasattr(self._local, 'http'):
+            from googleapiclient.http import build_http
+
+            self._local.http = build_http()
+        return self._local.http
+
+    def execute(self, request):
+        return request.execute(http=self._http())
+
+
+class FixtureStore:
+    """Directory of recorded API responses, one JSON file per request.
+
+    Files are named after a hash of the request's method and parameters,
+    so the same request made again maps to the same file. API errors are
+    recorded with their status and body and raised again on replay.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, request):
+        digest = hashlib.sha1(request_key(request).encode()).hexdigest()
+        return os.path.join(self.directory, request.methodId.split('.')[1], f'{digest}.json')
+
+    def save(self, request, response=None, error=None):
+        """Record a response, or the HttpError a request failed with."""
+        fixture = {'request': request_key(request)}
+        if error is not None:
+            content = error.content
+            if isinstance(content, bytes):
+                content = content.decode('utf-8', 'replace')
+            fixture['error'] = {'status': error.resp.status, 'content': content}
+        else:
+            fixture['response'] = response
+        path = self._path(request)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first, so a concurrent replay never sees half a fixture
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(fixture, f)
+        os.replace(temp_path, path)
+
+    def load(self, request):
+        """Get the recorded response of a request, raising the recorded error if it failed."""
+        try:
+            with open(self._path(request)) as f:
+                fixture = json.load(f)
+        except FileNotFoundError:
+            raise FixtureNotFoundError(f'No recorded response for {request_key(request)}')
+        if 'error' in fixture:
+            import httplib2
+
+            error = fixture['error']
+            raise HttpError(httplib2.Response({'status': error['status']}), error['content'].encode())
+        return fixture['response']
+
+    def __len__(self):
+        if not os.path.isdir(self.directory):
+            return 0
+        return sum(
+            1 for _, _, files in os.walk(self.directory) for name in files if name.endswith('.json')
+        )
+
+
+class RecordingTransport:
+    """Sends API requests through another transport and records every response."""
+
+    def __init__(self, fixtures, transport=None):
+        self.fixtures = fixtures
+        self.transport = transport if transport is not None else LiveTransport()
+
+    def execute(self, request):
+        try:
+            response = self.transport.execute(request)
+        except HttpError as e:
+            # A 304 only answers the request's If-None-Match header, which fixtures are not keyed on
+            if e.resp.status != 304:
+                self.fixtures.save(request, error=e)
+            raise
+        self.fixtures.save(request, response)
+        return response
+
+
+class ReplayTransport:
+    """Answers API requests from recorded responses without touching the network."""
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+
+    def execute(self, request):
+        return self.fixtures.load(request)
+
+
+def create_transport():
+    """Create the transport selected by the YOUTUBE_TRANSPORT environment variable."""
+    transport_name = os.getenv('YOUTUBE_TRANSPORT', 'live')
+    if transport_name == 'live':
+        return LiveTransport()
+    fixtures = FixtureStore(os.getenv('YOUTUBE_FIXTURES_DIR', DEFAULT_FIXTURES_DIR))
+    if transport_name == 'record':
+        return RecordingTransport(fixtures)
+    if transport_name == 'replay':
+        return ReplayTransport(fixtures)
+    raise ValueError(f'Unknown transport: {transport_name}')
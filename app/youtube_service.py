@@ -1,15 +1,220 @@
+import contextvars
 import os
-from googleapiclient.discovery import build
+import threading
 from urllib.parse import urlparse, parse_qs
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import heapq
+import json
 import re
-from textblob import TextBlob
+import time
+import numpy as np
+from googleapiclient.errors import HttpError
+from app.cache import ResponseCache
+from app.channel_index import ChannelIndex
+from app.channel_stats import ChannelAccumulator
+from app.comment_store import CommentStore
+from app.instrumentation import span, record_api_call
+from app.quota import QuotaScheduler, QuotaExceededError
+from app.records import VideoRecord, ChannelRecord, CommentRecord, format_timestamp
+from app.snapshot_store import SnapshotStore, SECONDS_PER_DAY
+from app.tag_index import TagIndex, TAG, KEYWORD
+from app.sentiment import create_engine, SentimentAggregator
+from app.singleflight import SingleFlight
+from app.transport import create_transport
+
+# The API accepts at most 50 comma-separated IDs per videos().list call
+MAX_IDS_PER_REQUEST = 50
+
+# Upper bound on API requests in flight at once in this process, shared by all
+# service instances and threads. 1 disables concurrent fetching.
+MAX_CONCURRENCY = int(os.getenv('YOUTUBE_MAX_CONCURRENCY', 8))
+_api_slots = threading.BoundedSemaphore(MAX_CONCURRENCY)
+
+VIDEO_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]+$')
+
+# Most data points drawn on a video's performance timeline
+TIMELINE_MAX_POINTS = 30
+# Window over which recent growth rates are measured
+GROWTH_WINDOW_DAYS = 7
+
+# Largest number of videos accepted by a single bulk analysis
+MAX_BULK_VIDEOS = 500
+# Comment fetches a bulk analysis keeps in flight, leaving the other pool
+# workers to interactive requests
+BULK_CONCURRENCY = int(os.getenv('YOUTUBE_BULK_CONCURRENCY', max(1, MAX_CONCURRENCY // 2)))
+
+# commentThreads().list returns at most 100 threads per page
+MAX_COMMENTS_PER_PAGE = 100
+DEFAULT_STREAM_MAX_COMMENTS = 10000
+DEFAULT_STREAM_TIME_BUDGET = 30
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_client(api_key):
+    """Get this process's YouTube discovery client for an API key, building it on first use."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            # Imported here, the discovery module alone takes longer to import than Flask
+            from googleapiclient.discovery import build
+            # Uses the discovery document bundled with the client library, nothing is fetched
+            client = _clients[api_key] = build(
+                'youtube', 'v3', developerKey=api_key, static_discovery=True, cache_discovery=False
+            )
+        return client
+
+class FetchContext:
+    """Resources resolved and fetched during a single analysis request.
+
+    Each resource is fetched at most once per context, so the steps of an
+    analysis can share channel ID lookups and API payloads instead of
+    repeating the calls.
+    """
+
+    def __init__(self):
+        self._results = {}
+
+    def fetch(self, key, fetch):
+        """Get the result stored under key, calling fetch() the first time."""
+        if key not in self._results:
+            self._results[key] = fetch()
+        return self._results[key]
 
 class YouTubeService:
+    """YouTube Data API client and analytics.
+
+    A single instance is shared by all Flask request threads. API requests
+    are built from the process-wide discovery client, built on first use,
+    and executed by a transport:
+    live on per-thread HTTP connections, or recorded to and replayed from
+    fixtures. All shared state is guarded by locks.
+    """
+
     def __init__(self):
         self.api_key = os.getenv('YOUTUBE_API_KEY')
-        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+        self.api_calls = Counter()
+        self._api_calls_lock = threading.Lock()
+        self.transport = create_transport()
+        self.cache = ResponseCache.from_env()
+        self.channel_index = ChannelIndex.from_env()
+        self.sentiment_engine = create_engine()
+        self.comment_store = CommentStore.from_env()
+        self.scheduler = QuotaScheduler.from_env()
+        self.snapshot_store = SnapshotStore.from_env()
+        self.tag_index = TagIndex.from_env()
+        self.single_flight = SingleFlight()
+        self._executor = None
+        if MAX_CONCURRENCY > 1:
+            self._executor = ThreadPoolExecutor(
+                max_workers=MAX_CONCURRENCY,
+                thread_name_prefix='youtube-api'
+            )
+
+    @property
+    def youtube(self):
+        return get_client(self.api_key)
+
+    def warm_up(self):
+        """Build the API client and load the sentiment backend ahead of the first request."""
+        get_client(self.api_key)
+        self.sentiment_engine.warm_up()
+
+    def _execute(self, request):
+        """Execute an API request, counting it per API method.
+        
+        An expired cached response is revalidated with its ETag, and reused
+        as is when the API answers 304 Not Modified.
+        """
+        return self._execute_request(request)[0]
+
+    def _execute_request(self, request):
+        """Execute an API request like _execute, returning (response, cached).
+        
+        cached is True when the response was served from the cache without
+        asking the API, so it may be older than the current state.
+        """
+        stale = None
+        if self.cache is not None:
+            cached = self.cache.get(request)
+            if cached is not None:
+                return cached, True
+            stale = self.cache.get_stale(request)
+        
+        # Requests made by list_next() share their headers with the previous page's
+        etag = stale.get('etag') if stale is not None else None
+        request.headers = {name: value for name, value in request.headers.items() if name != 'If-None-Match'}
+        if etag is not None:
+            request.headers['If-None-Match'] = etag
+        
+        with self._api_calls_lock:
+            self.api_calls[request.methodId] += 1
+        start = time.perf_counter()
+        try:
+            response = self.scheduler.run(request.methodId, lambda: self._send(request))
+        except HttpError as e:
+            if etag is None or e.resp.status != 304:
+                raise
+            record_api_call(request.methodId, time.perf_counter() - start, 0)
+            self.cache.revalidated(request, stale)
+            return stale, False
+        # Serialized once for both the size metric and the cache
+        payload = json.dumps(response)
+        record_api_call(request.methodId, time.perf_counter() - start, len(payload))
+        
+        if self.cache is not None:
+            self.cache.set(request, response, payload)
+        return response, False
+
+    def _send(self, request):
+        """Send a request through the transport, within the concurrency limit."""
+        with _api_slots:
+            return self.transport.execute(request)
+
+    def _submit(self, executor, fetch, *args):
+        """Submit a fetch to a thread pool, carrying over the caller's context."""
+        # Keeps quota spend attributed to the route that triggered the fetch
+        return executor.submit(contextvars.copy_context().run, fetch, *args)
+
+    def _run_concurrently(self, *fetches):
+        """Run independent fetches in parallel and return their results in order."""
+        if self._executor is None:
+            return [fetch() for fetch in fetches]
+        
+        # The calling thread runs the first fetch itself instead of idling
+        futures = [self._submit(self._executor, fetch) for fetch in fetches[1:]]
+        first = fetches[0]()
+        return [first] + [future.result() for future in futures]
+
+    def _coalesce(self, key, compute):
+        """Run compute() once for all concurrent callers with the same key."""
+        if self.single_flight is None:
+            return compute()
+        return self.single_flight.do(key, compute)
+
+    def get_coalescing_stats(self):
+        """Get how many analyses ran and how many callers joined one in flight."""
+        if self.single_flight is None:
+            return {'enabled': False}
+        return dict(self.single_flight.stats(), enabled=True)
+
+    def get_api_call_counts(self):
+        """Get the number of API calls made per method."""
+        with self._api_calls_lock:
+            return dict(self.api_calls)
+
+    def get_cache_stats(self):
+        """Get response cache hit, miss and eviction metrics."""
+        if self.cache is None:
+            return {'enabled': False}
+        return dict(self.cache.stats(), enabled=True)
+
+    def reset_api_call_counts(self):
+        """Reset the per-method API call counters."""
+        with self._api_calls_lock:
+            self.api_calls.clear()
 
     def extract_video_id(self, video_url):
         """Extract video ID from YouTube URL."""
@@ -21,31 +226,23 @@ class YouTubeService:
                 return parse_qs(parsed_url.query)['v'][0]
         raise ValueError('Invalid YouTube URL')
 
-    def extract_channel_id(self, channel_url):
+    def extract_channel_id(self, channel_url, ctx=None):
         """Extract channel ID from YouTube URL."""
+        if ctx is not None:
+            return ctx.fetch(('channel_id', channel_url), lambda: self.extract_channel_id(channel_url))
+        
         parsed_url = urlparse(channel_url)
         path_parts = parsed_url.path.split('/')
         
         # Handle different URL formats
-        if 'youtube.com' not in parsed_url.hostname and 'youtu.be' not in parsed_url.hostname:
+        if not parsed_url.hostname or (
+            'youtube.com' not in parsed_url.hostname and 'youtu.be' not in parsed_url.hostname
+        ):
             raise ValueError('Invalid YouTube URL')
 
         # Handle @username format
         if path_parts[1].startswith('@'):
-            try:
-                # First, search for the channel by handle
-                request = self.youtube.search().list(
-                    part='snippet',
-                    q=path_parts[1],
-                    type='channel',
-                    maxResults=1
-                )
-                response = request.execute()
-                if response['items']:
-                    return response['items'][0]['snippet']['channelId']
-                raise ValueError('Channel not found')
-            except Exception as e:
-                raise ValueError(f'Error finding channel: {str(e)}')
+            return self._search_channel_id(path_parts[1])
 
         # Handle /channel/ID format
         if 'channel' in path_parts:
@@ -53,105 +250,232 @@ class YouTubeService:
             
         # Handle /c/custom-name format or /user/username format
         if 'c' in path_parts or 'user' in path_parts:
-            try:
-                # Get channel ID by username or custom URL
-                request = self.youtube.search().list(
-                    part='snippet',
-                    q=path_parts[-1],
-                    type='channel',
-                    maxResults=1
-                )
-                response = request.execute()
-                if response['items']:
-                    return response['items'][0]['snippet']['channelId']
-                raise ValueError('Channel not found')
-            except Exception as e:
-                raise ValueError(f'Error finding channel: {str(e)}')
+            return self._search_channel_id(path_parts[-1])
                 
         raise ValueError('Invalid YouTube channel URL format')
 
-    def get_video_data(self, video_url):
-        """Get basic video information."""
-        video_id = self.extract_video_id(video_url)
+    def _search_channel_id(self, name):
+        """Resolve a channel handle or custom name, consulting the local index first."""
+        if self.channel_index is not None:
+            channel_id = self.channel_index.lookup(name)
+            if channel_id is ChannelIndex.NOT_FOUND:
+                raise ValueError('Error finding channel: Channel not found')
+            if channel_id is not None:
+                return channel_id
+        
+        try:
+            # Search for the channel by handle, username or custom URL
+            request = self.youtube.search().list(
+                part='snippet',
+                q=name,
+                type='channel',
+                maxResults=1
+            )
+            response = self._execute(request)
+        except QuotaExceededError:
+            raise
+        except Exception as e:
+            raise ValueError(f'Error finding channel: {str(e)}')
+        
+        channel_id = response['items'][0]['snippet']['channelId'] if response['items'] else None
+        if self.channel_index is not None:
+            self.channel_index.store(name, channel_id)
+        if channel_id is None:
+            raise ValueError('Error finding channel: Channel not found')
+        return channel_id
+
+    def warm_channel_index(self, channel_urls):
+        """Resolve a list of channel URLs ahead of time to fill the channel index."""
+        results = {'resolved': 0, 'not_found': 0, 'failed': []}
+        for channel_url in channel_urls:
+            try:
+                self.extract_channel_id(channel_url)
+                results['resolved'] += 1
+            except ValueError as e:
+                if 'Channel not found' in str(e):
+                    results['not_found'] += 1
+                else:
+                    results['failed'].append({'url': channel_url, 'error': str(e)})
+        return results
+
+    def _get_video_record(self, video_id, ctx=None, snapshot=False):
+        """Get a video as a VideoRecord, or None if it does not exist.
+        
+        With snapshot, statistics fetched from the API are recorded in the
+        snapshot store.
+        """
+        if ctx is not None:
+            return ctx.fetch(('video', video_id), lambda: self._get_video_record(video_id, snapshot=snapshot))
+        
         request = self.youtube.videos().list(
             part='snippet,statistics,contentDetails',
             id=video_id
         )
-        response = request.execute()
-        
-        if not response['items']:
-            raise ValueError('Video not found')
-            
-        video = response['items'][0]
-        return {
-            'title': video['snippet']['title'],
-            'description': video['snippet']['description'],
-            'publishedAt': video['snippet']['publishedAt'],
-            'viewCount': video['statistics']['viewCount'],
-            'likeCount': video['statistics'].get('likeCount', 0),
-            'commentCount': video['statistics'].get('commentCount', 0),
-            'duration': video['contentDetails']['duration']
-        }
+        response, cached = self._execute_request(request)
+        if snapshot and not cached:
+            self._record_snapshots(response['items'])
+        return VideoRecord.from_api(response['items'][0]) if response['items'] else None
 
-    def get_channel_data(self, channel_url):
-        """Get channel information."""
-        channel_id = self.extract_channel_id(channel_url)
+    def _get_channel_record(self, channel_id, ctx=None):
+        """Get a channel as a ChannelRecord, or None if it does not exist."""
+        if ctx is not None:
+            return ctx.fetch(('channel', channel_id), lambda: self._get_channel_record(channel_id))
+        
         request = self.youtube.channels().list(
             part='snippet,statistics,contentDetails',
             id=channel_id
         )
-        response = request.execute()
+        response = self._execute(request)
+        return ChannelRecord.from_api(response['items'][0]) if response['items'] else None
+
+    def get_video(self, video_url, ctx=None, snapshot=False):
+        """Get a video's VideoRecord."""
+        video_id = self.extract_video_id(video_url)
+        with span('video'):
+            video = self._get_video_record(video_id, ctx, snapshot)
         
-        if not response['items']:
+        if video is None:
+            raise ValueError('Video not found')
+        
+        return video
+
+    def get_video_data(self, video_url, ctx=None):
+        """Get basic video information."""
+        return self.get_video(video_url, ctx).to_basic_metrics()
+
+    def get_channel_data(self, channel_url, ctx=None):
+        """Get channel information."""
+        channel_id = self.extract_channel_id(channel_url, ctx)
+        with span('channel'):
+            channel = self._get_channel_record(channel_id, ctx)
+        
+        if channel is None:
             raise ValueError('Channel not found')
             
-        channel = response['items'][0]
-        return {
-            'title': channel['snippet']['title'],
-            'description': channel['snippet']['description'],
-            'publishedAt': channel['snippet']['publishedAt'],
-            'subscriberCount': channel['statistics'].get('subscriberCount', '0'),
-            'videoCount': channel['statistics']['videoCount'],
-            'viewCount': channel['statistics']['viewCount']
-        }
+        return channel.to_basic_info()
 
-    def get_video_comments(self, video_url, max_results=100):
+    def get_video_comments(self, video_url, max_results=100, ctx=None):
         """Get video comments."""
         video_id = self.extract_video_id(video_url)
+        if ctx is not None:
+            return ctx.fetch(
+                ('comments', video_id, max_results),
+                lambda: self.get_video_comments(video_url, max_results)
+            )
+        
+        with span('comments'):
+            request = self.youtube.commentThreads().list(
+                part='snippet',
+                videoId=video_id,
+                maxResults=max_results,
+                order='relevance'
+            )
+            response = self._execute(request)
+            
+            return [CommentRecord.from_api(item) for item in response['items']]
+
+    def iter_comment_pages(self, video_url, max_comments=None, time_budget=None, order='relevance'):
+        """Walk all comment pages of a video, yielding one list of comments per page.
+        
+        Paging stops after max_comments comments or once time_budget seconds
+        have passed, whichever comes first.
+        """
+        video_id = self.extract_video_id(video_url)
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        remaining = max_comments
+        
         request = self.youtube.commentThreads().list(
             part='snippet',
             videoId=video_id,
-            maxResults=max_results,
-            order='relevance'
+            maxResults=MAX_COMMENTS_PER_PAGE if remaining is None else min(remaining, MAX_COMMENTS_PER_PAGE),
+            order=order
         )
-        response = request.execute()
-        
-        comments = []
-        for item in response['items']:
-            comment = item['snippet']['topLevelComment']['snippet']
-            comments.append({
-                'author': comment['authorDisplayName'],
-                'text': comment['textDisplay'],
-                'publishedAt': comment['publishedAt'],
-                'likeCount': comment['likeCount']
-            })
-        return comments
+        while request is not None:
+            response = self._execute(request)
+            comments = [CommentRecord.from_api(item) for item in response['items']]
+            if remaining is not None:
+                comments = comments[:remaining]
+                remaining -= len(comments)
+            yield comments
+            
+            if remaining == 0 or (deadline is not None and time.monotonic() >= deadline):
+                return
+            request = self.youtube.commentThreads().list_next(request, response)
+
+    def sync_comment_sentiment(self, video_url, max_comments=DEFAULT_STREAM_MAX_COMMENTS):
+        """Score the comments posted since the last sync and get the video's stored sentiment.
+        
+        Comments are walked newest first and paging stops at the first comment
+        already in the store, so repeat analyses only fetch and score what is new.
+        When max_comments cuts a walk short, the page it stopped at is kept as
+        a backfill cursor, and later syncs spend what is left of max_comments
+        resuming from it until the stored comments have no gaps.
+        """
+        video_id = self.extract_video_id(video_url)
+        # Concurrent syncs of the same video, even through different URLs, share one
+        return self._coalesce(
+            ('comment_sync', video_id), lambda: self._sync_comment_sentiment(video_url, video_id, max_comments)
+        )
+
+    def _sync_comment_sentiment(self, video_url, video_id, max_comments):
+        new_comments, cursor = self._collect_unseen_comments(video_id, None, max_comments)
+        cursors = [cursor] if cursor is not None else []
+        
+        # Fill the gaps left by earlier syncs that max_comments cut short
+        resumed = []
+        for page_token in self.comment_store.get_cursors(video_id):
+            budget = max_comments - len(new_comments)
+            if budget <= 0:
+                break
+            comments, cursor = self._collect_unseen_comments(video_id, page_token, budget)
+            new_comments.extend(comments)
+            resumed.append(page_token)
+            if cursor is not None:
+                cursors.append(cursor)
+        
+        if new_comments or cursors or resumed:
+            polarities = self.sentiment_engine.polarities([comment.text for comment in new_comments])
+            self.comment_store.add_comments(video_id, new_comments, polarities, resumed, cursors)
+        return self.comment_store.get_sentiment(video_id)
+
+    def _collect_unseen_comments(self, video_id, page_token, max_comments):
+        """Walk a video's comments newest first from page_token up to the first stored one.
+        
+        Returns the comments walked and, when max_comments ran out before a
+        stored comment or the oldest comment was reached, the page token to
+        resume from. Whole pages are walked, so no comment is skipped on resume.
+        """
+        unseen = []
+        request = self.youtube.commentThreads().list(
+            part='snippet',
+            videoId=video_id,
+            maxResults=MAX_COMMENTS_PER_PAGE,
+            order='time',
+            **({'pageToken': page_token} if page_token is not None else {})
+        )
+        while request is not None:
+            response = self._execute(request)
+            comments = [CommentRecord.from_api(item) for item in response['items']]
+            known_ids = self.comment_store.known_ids([comment.id for comment in comments])
+            for comment in comments:
+                if comment.id in known_ids:
+                    return unseen, None
+                unseen.append(comment)
+            if len(unseen) >= max_comments:
+                return unseen, response.get('nextPageToken')
+            request = self.youtube.commentThreads().list_next(request, response)
+        return unseen, None
 
     def get_video_analytics(self, video_url):
         """Get video analytics data."""
-        video_id = self.extract_video_id(video_url)
-        video_data = self.get_video_data(video_url)
+        video = self.get_video(video_url)
         
         # For public API, we can only get basic analytics
         return {
-            'views': video_data['viewCount'],
-            'likes': video_data['likeCount'],
-            'comments': video_data['commentCount'],
-            'engagement_rate': self._calculate_engagement_rate(
-                int(video_data['viewCount']),
-                int(video_data['likeCount']),
-                int(video_data['commentCount'])
-            )
+            'views': str(video.views),
+            'likes': str(video.likes),
+            'comments': str(video.comments),
+            'engagement_rate': self._calculate_engagement_rate(video.views, video.likes, video.comments)
         }
 
     def _calculate_engagement_rate(self, views, likes, comments):
@@ -160,16 +484,17 @@ class YouTubeService:
             return 0
         return ((likes + comments) / views) * 100 
 
-    def _analyze_video_performance_timeline(self, video_data):
+    def _analyze_video_performance_timeline(self, video):
         """Analyze video performance metrics over time."""
-        published_date = datetime.strptime(video_data['publishedAt'], '%Y-%m-%dT%H:%M:%SZ')
+        video_id = video.id
+        published_date = video.published_at
         current_date = datetime.utcnow()
         days_since_upload = (current_date - published_date).days
 
         # Calculate daily average metrics
-        total_views = int(video_data['viewCount'])
-        total_likes = int(video_data['likeCount'])
-        total_comments = int(video_data['commentCount'])
+        total_views = video.views
+        total_likes = video.likes
+        total_comments = video.comments
 
         # Create timeline data points
         timeline_data = {
@@ -191,48 +516,72 @@ class YouTubeService:
                     'views': [],
                     'engagement': []
                 }
-            }
+            },
+            'growth_rates': None
         }
 
-        # Generate estimated performance data points
-        num_points = min(30, days_since_upload)  # Show up to 30 data points
-        if num_points > 0:
-            interval = days_since_upload / num_points
-            for i in range(num_points + 1):
-                point_date = published_date + timedelta(days=i * interval)
-                progress_ratio = i / num_points
-                
-                # Estimate metrics using a typical viral decay curve
-                estimated_views = total_views * (1 - (1 - progress_ratio) ** 2)
-                estimated_engagement = ((total_likes + total_comments) / max(estimated_views, 1)) * 100
+        # Use the recorded snapshots, or just the current totals until more are taken
+        if self.snapshot_store is not None:
+            snapshots = self.snapshot_store.daily_series(video_id, max_points=TIMELINE_MAX_POINTS)
+            timeline_data['growth_rates'] = self.snapshot_store.growth_rates(
+                video_id, start=time.time() - GROWTH_WINDOW_DAYS * SECONDS_PER_DAY
+            )
+        if self.snapshot_store is None or len(snapshots) == 0:
+            snapshots = {
+                'timestamp': np.array([int(time.time())]),
+                'views': np.array([total_views]),
+                'likes': np.array([total_likes]),
+                'comments': np.array([total_comments])
+            }
 
-                timeline_data['performance_data']['dates'].append(point_date.strftime('%Y-%m-%d'))
-                timeline_data['performance_data']['metrics']['views'].append(round(estimated_views))
-                timeline_data['performance_data']['metrics']['engagement'].append(round(estimated_engagement, 2))
+        engagement = (snapshots['likes'] + snapshots['comments']) / np.maximum(snapshots['views'], 1) * 100
+        timeline_data['performance_data']['dates'] = [
+            datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%d')
+            for timestamp in snapshots['timestamp'].tolist()
+        ]
+        timeline_data['performance_data']['metrics']['views'] = snapshots['views'].tolist()
+        timeline_data['performance_data']['metrics']['engagement'] = np.round(engagement, 2).tolist()
 
         return timeline_data
 
     def get_video_performance(self, video_url):
         """Get detailed video performance metrics."""
+        # Concurrent requests for the same video share one computation
         video_id = self.extract_video_id(video_url)
+        return self._coalesce(('video', video_id), lambda: self._get_video_performance(video_url))
+
+    def _get_video_performance(self, video_url):
+        ctx = FetchContext()
         
-        # Get video details
-        video_data = self.get_video_data(video_url)
-        
-        # Get video comments for sentiment analysis
-        comments = self.get_video_comments(video_url)
-        
-        # Perform sentiment analysis on comments
-        sentiment_data = self._analyze_comments_sentiment(comments)
-        
-        # Calculate engagement metrics
-        engagement_data = self._calculate_engagement_metrics(video_data)
-        
-        # Analyze performance timeline
-        timeline_data = self._analyze_video_performance_timeline(video_data)
+        # Get video details and comment sentiment in parallel
+        video, sentiment_data = self._run_concurrently(
+            lambda: self.get_video(video_url, ctx, snapshot=True),
+            lambda: self._get_comment_sentiment_data(video_url, ctx)
+        )
         
-        # Extract and analyze tags
-        tags_data = self._analyze_video_tags(video_data.get('tags', []))
+        return self._build_video_performance(video, sentiment_data)
+
+    def _get_comment_sentiment_data(self, video_url, ctx=None):
+        """Get the sentiment analysis of a video's comments."""
+        with span('comment_sentiment'):
+            # Score incrementally when a comment store is set up
+            if self.comment_store is not None:
+                return self.sync_comment_sentiment(video_url)
+            return self._analyze_comments_sentiment(self.get_video_comments(video_url, ctx=ctx))
+
+    def _build_video_performance(self, video, sentiment_data):
+        """Combine a VideoRecord and comment sentiment into the performance report."""
+        with span('analysis'):
+            video_data = video.to_basic_metrics()
+            
+            # Calculate engagement metrics
+            engagement_data = self._calculate_engagement_metrics(video)
+            
+            # Analyze performance timeline
+            timeline_data = self._analyze_video_performance_timeline(video)
+            
+            # Extract and analyze tags
+            tags_data = self._analyze_video_tags(video_data.get('tags', []))
         
         return {
             'basic_metrics': video_data,
@@ -242,73 +591,388 @@ class YouTubeService:
             'timeline_data': timeline_data
         }
 
-    def get_channel_analytics(self, channel_url):
-        """Get detailed channel analytics."""
-        channel_id = self.extract_channel_id(channel_url)
+    def iter_videos_performance(self, videos):
+        """Analyze many videos, yielding each result as soon as it is ready.
+        
+        videos is a list of video URLs or IDs. Statistics are fetched in
+        batches of 50 IDs while comment sentiment runs concurrently. Every
+        distinct input produces one {'video': ..., 'result': ...} or
+        {'video': ..., 'error': ...} entry, in completion order. Inputs naming
+        the same video are analyzed once and all get its entry.
+        """
+        if not isinstance(videos, list) or not all(isinstance(video, str) for video in videos):
+            raise ValueError('videos must be a list of video URLs or IDs')
+        if len(videos) > MAX_BULK_VIDEOS:
+            raise ValueError(f'At most {MAX_BULK_VIDEOS} videos can be analyzed at once')
+        
+        # Video ID -> the inputs naming it
+        inputs = {}
+        for video in dict.fromkeys(videos):
+            try:
+                inputs.setdefault(self.to_video_id(video), []).append(video)
+            except (ValueError, KeyError):
+                yield {'video': video, 'error': 'Invalid YouTube URL'}
+        
+        # Start the comment fetches first, they take longest. Only a few run
+        # at a time, the next one starting whenever one finishes.
+        queued = iter(inputs)
+        sentiment_futures = {}
+        
+        def submit_next():
+            video_id = next(queued, None)
+            if video_id is not None:
+                future = self._submit(
+                    self._executor, self._get_comment_sentiment_data, f'https://www.youtube.com/watch?v={video_id}'
+                )
+                sentiment_futures[future] = video_id
+        
+        if self._executor is not None:
+            for _ in range(BULK_CONCURRENCY):
+                submit_next()
+        
+        try:
+            records = {record.id: record for record in self._get_videos_by_ids(list(inputs), snapshot=True)}
+            statistics_error = None
+        except Exception as e:
+            records = {}
+            statistics_error = str(e)
+        
+        def build_entries(video_id, get_sentiment_data):
+            if statistics_error is not None:
+                entry = {'error': statistics_error}
+            elif video_id not in records:
+                entry = {'error': 'Video not found'}
+            else:
+                try:
+                    entry = {'result': self._build_video_performance(records[video_id], get_sentiment_data())}
+                except Exception as e:
+                    entry = {'error': str(e)}
+            return [{'video': video, **entry} for video in inputs[video_id]]
         
-        # Get basic channel info
-        channel_data = self.get_channel_data(channel_url)
+        if self._executor is None:
+            for video_id in inputs:
+                video_url = f'https://www.youtube.com/watch?v={video_id}'
+                yield from build_entries(video_id, lambda: self._get_comment_sentiment_data(video_url))
+            return
         
-        # Get channel's videos
-        videos_data = self._get_channel_videos(channel_id)
+        while sentiment_futures:
+            done, _ = wait(sentiment_futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                video_id = sentiment_futures.pop(future)
+                submit_next()
+                yield from build_entries(video_id, future.result)
+
+    def get_videos_performance(self, videos):
+        """Analyze many videos, returning results in input order."""
+        results = {entry['video']: entry for entry in self.iter_videos_performance(videos)}
+        return [results[video] for video in dict.fromkeys(videos)]
+
+    def to_video_id(self, video):
+        """Get the video ID from a video URL or a bare ID."""
+        if '/' in video:
+            return self.extract_video_id(video)
+        if not VIDEO_ID_PATTERN.match(video):
+            raise ValueError('Invalid YouTube URL')
+        return video
+
+    def get_channel_analytics(self, channel_url, progress=None, full_history=False):
+        """Get detailed channel analytics.
         
-        # Analyze upload frequency
-        upload_analysis = self._analyze_upload_frequency(videos_data)
+        By default the 50 most recent uploads are analyzed; with full_history
+        the whole upload history is streamed through constant-memory
+        aggregates. progress, if given, is called with keyword arguments
+        describing partial results as they become available.
+        """
+        ctx = FetchContext()
+        channel_id = self.extract_channel_id(channel_url, ctx)
+        analyze = self._get_channel_history_analytics if full_history else self._get_channel_analytics
+        # Concurrent requests for the same channel share one computation; a
+        # caller tracking progress needs its own run to receive the updates
+        if progress is None:
+            return self._coalesce(
+                ('channel', channel_id, full_history),
+                lambda: analyze(channel_url, ctx, channel_id)
+            )
+        return analyze(channel_url, ctx, channel_id, progress)
+
+    def _get_channel_data_reporting(self, channel_url, ctx, progress):
+        """Get channel information, reporting it as progress once known."""
+        channel_data = self.get_channel_data(channel_url, ctx)
+        if progress is not None:
+            progress(basic_info=channel_data)
+        return channel_data
+
+    def _get_channel_history_analytics(self, channel_url, ctx, channel_id, progress=None):
+        """Analyze a channel's whole upload history in bounded memory."""
+        def stream_uploads():
+            accumulator = ChannelAccumulator()
+            with span('channel_videos'):
+                for videos in self.iter_channel_video_pages(channel_id, ctx=ctx, progress=progress):
+                    for video in videos:
+                        accumulator.add(video)
+                    # The aggregates cover the uploads walked so far, newest first
+                    if progress is not None:
+                        progress(
+                            upload_analysis=accumulator.upload_analysis(),
+                            performance_trends=accumulator.performance_trends()
+                        )
+            return accumulator
         
-        # Analyze video performance trends
-        performance_trends = self._analyze_performance_trends(videos_data)
+        channel_data, accumulator = self._run_concurrently(
+            lambda: self._get_channel_data_reporting(channel_url, ctx, progress),
+            stream_uploads
+        )
+        
+        return {
+            'basic_info': channel_data,
+            'upload_analysis': accumulator.upload_analysis(),
+            'performance_trends': accumulator.performance_trends(),
+            'recent_videos': [video.to_dict() for video in accumulator.recent_videos]
+        }
+
+    def _get_channel_analytics(self, channel_url, ctx, channel_id, progress=None):
+        """Analyze a channel's 50 most recent uploads."""
+        # Get basic channel info and the channel's videos in parallel
+        channel_data, videos_data = self._run_concurrently(
+            lambda: self._get_channel_data_reporting(channel_url, ctx, progress),
+            lambda: self._get_channel_videos(channel_id, ctx=ctx, progress=progress)
+        )
+        
+        with span('analysis'):
+            # Analyze upload frequency
+            upload_analysis = self._analyze_upload_frequency(videos_data)
+            
+            # Analyze video performance trends
+            performance_trends = self._analyze_performance_trends(videos_data)
         
         return {
             'basic_info': channel_data,
             'upload_analysis': upload_analysis,
             'performance_trends': performance_trends,
-            'recent_videos': videos_data[:10]  # Last 10 videos
+            'recent_videos': [video.to_dict() for video in videos_data[:10]]  # Last 10 videos
         }
 
-    def _get_channel_videos(self, channel_id, max_results=50):
+    def _get_channel_videos(self, channel_id, max_results=50, ctx=None, progress=None):
         """Get channel's videos with detailed metrics."""
         try:
-            # First get playlist ID of channel uploads
-            channels_response = self.youtube.channels().list(
-                part='contentDetails',
-                id=channel_id
-            ).execute()
-            
-            if not channels_response['items']:
-                return []
-                
-            uploads_playlist_id = channels_response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-            
-            # Get videos from uploads playlist
             videos = []
-            request = self.youtube.playlistItems().list(
-                part='snippet,contentDetails',
-                playlistId=uploads_playlist_id,
-                maxResults=max_results
-            )
-            
-            while request and len(videos) < max_results:
-                response = request.execute()
-                
-                # Get detailed info for each video
-                for item in response['items']:
-                    video_id = item['contentDetails']['videoId']
-                    video_details = self.youtube.videos().list(
-                        part='snippet,statistics,contentDetails',
-                        id=video_id
-                    ).execute()
-                    
-                    if video_details['items']:
-                        videos.append(video_details['items'][0])
-                
-                request = self.youtube.playlistItems().list_next(request, response)
-                
+            with span('channel_videos'):
+                for page in self.iter_channel_video_pages(channel_id, max_results, ctx, progress):
+                    videos.extend(page)
             return videos
             
+        except QuotaExceededError:
+            raise
         except Exception as e:
             print(f"Error fetching channel videos: {str(e)}")
             return []
 
+    def iter_channel_video_pages(self, channel_id, max_results=None, ctx=None, progress=None, until=None,
+                                 index_tags=False):
+        """Walk a channel's uploads playlist, yielding the VideoRecords of each page.
+        
+        Walks the whole upload history unless max_results is given, or until
+        the first page holding an upload published at or before until (an API
+        timestamp). The next playlist page is fetched while the current page's
+        details are in flight. With index_tags, each page's videos are added
+        to the tag index.
+        """
+        # First get playlist ID of channel uploads
+        uploads_playlist_id = self._get_uploads_playlist_id(channel_id, ctx)
+        
+        if uploads_playlist_id is None:
+            return
+        
+        # Get videos from uploads playlist
+        limit = max_results if max_results is not None else float('inf')
+        fetched = 0
+        request = self.youtube.playlistItems().list(
+            part='contentDetails',
+            playlistId=uploads_playlist_id,
+            maxResults=min(limit, MAX_IDS_PER_REQUEST)
+        )
+        response = self._execute(request)
+        total = response.get('pageInfo', {}).get('totalResults', 0)
+        if max_results is not None:
+            total = min(total, max_results)
+        
+        with ThreadPoolExecutor(max_workers=1) as prefetcher:
+            while response and fetched < limit:
+                video_ids = [item['contentDetails']['videoId'] for item in response['items']]
+                if max_results is not None:
+                    video_ids = video_ids[:max_results - fetched]
+                
+                # Uploads are listed newest first, so no later page is needed
+                published = (item['contentDetails'].get('videoPublishedAt') for item in response['items'])
+                reached = until is not None and any(
+                    published_at is not None and published_at <= until for published_at in published
+                )
+                
+                # Fetch the next page while this page's video details are in flight
+                next_page = None
+                if not reached and fetched + len(video_ids) < limit:
+                    request = self.youtube.playlistItems().list_next(request, response)
+                    if request:
+                        next_page = self._submit(prefetcher, self._execute, request)
+                
+                videos = self._get_videos_by_ids(video_ids, keep_description=False, index_tags=index_tags)
+                fetched += len(videos)
+                if progress is not None:
+                    progress(videos_fetched=fetched, videos_total=max(total, fetched))
+                yield videos
+                response = next_page.result() if next_page else None
+
+    def _record_snapshots(self, items, min_interval=None):
+        """Record the statistics of videos().list items just fetched from the API in the snapshot store."""
+        if self.snapshot_store is None:
+            return
+        for item in items:
+            stats = item.get('statistics', {})
+            self.snapshot_store.record(
+                item['id'], int(stats.get('viewCount', 0)), int(stats.get('likeCount', 0)),
+                int(stats.get('commentCount', 0)), min_interval=min_interval
+            )
+
+    def _index_video_items(self, items):
+        """Add fetched videos' tags, keywords and stats to the tag index."""
+        if self.tag_index is None:
+            return
+        with span('tag_index'):
+            self.tag_index.add_videos(items)
+
+    def sync_tag_index(self, channel_id):
+        """Index the channel's uploads that are not in the tag index yet.
+        
+        The first sync walks the whole upload history. Later syncs walk it
+        newest first and stop at the first page reaching back to the newest
+        upload a previous sync walked.
+        """
+        synced, synced_through = self.tag_index.get_sync(channel_id)
+        newest = synced_through
+        pages = self.iter_channel_video_pages(channel_id, until=synced_through if synced else None, index_tags=True)
+        for videos in pages:
+            for video in videos:
+                published_at = format_timestamp(video.published_at)
+                if newest is None or published_at > newest:
+                    newest = published_at
+        self.tag_index.mark_synced(channel_id, newest)
+
+    def _synced_tag_index(self, channel_url, kind):
+        """Bring a channel's tag index up to date and get the channel ID."""
+        if self.tag_index is None:
+            raise ValueError('The tag index is disabled')
+        if kind not in (TAG, KEYWORD):
+            raise ValueError(f'Unknown term kind: {kind}')
+        channel_id = self.extract_channel_id(channel_url)
+        # Concurrent requests for the same channel share one sync
+        self._coalesce(('tag_sync', channel_id), lambda: self.sync_tag_index(channel_id))
+        return channel_id
+
+    def get_channel_tag_analytics(self, channel_url, kind=TAG, order_by='views', limit=20, min_videos=2):
+        """Rank the tags or title/description keywords of a channel's videos by their average performance."""
+        channel_id = self._synced_tag_index(channel_url, kind)
+        with span('tag_index'):
+            return {
+                'channel_id': channel_id,
+                'index': self.tag_index.channel_stats(channel_id),
+                'kind': kind,
+                'order_by': order_by,
+                'terms': self.tag_index.top_terms(channel_id, kind, order_by, limit, min_videos)
+            }
+
+    def get_tag_co_occurrence(self, channel_url, term, kind=TAG, limit=20):
+        """Get the terms most often used together with term across a channel's videos."""
+        channel_id = self._synced_tag_index(channel_url, kind)
+        with span('tag_index'):
+            return dict(
+                self.tag_index.co_occurring(channel_id, term, kind, limit),
+                channel_id=channel_id,
+                kind=kind
+            )
+
+    def _get_uploads_playlist_id(self, channel_id, ctx=None):
+        """Get the ID of the playlist holding a channel's uploads."""
+        # A "UC..." channel keeps its uploads in "UU...", so the playlist walk
+        # does not have to wait for the channels().list call
+        if channel_id.startswith('UC'):
+            return 'UU' + channel_id[2:]
+        
+        channel = self._get_channel_record(channel_id, ctx)
+        if channel is None:
+            return None
+        return channel.uploads_playlist_id
+
+    def _get_channels_by_ids(self, channel_ids):
+        """Get the raw resources of channels in batches of up to 50 IDs per call."""
+        channels = []
+        for start in range(0, len(channel_ids), MAX_IDS_PER_REQUEST):
+            batch = channel_ids[start:start + MAX_IDS_PER_REQUEST]
+            response = self._execute(self.youtube.channels().list(
+                part='snippet,statistics,contentDetails',
+                id=','.join(batch),
+                maxResults=len(batch)
+            ))
+            channels.extend(response['items'])
+        return channels
+
+    def refresh_videos(self, video_ids, snapshot_min_interval=None):
+        """Fetch current details of many videos in batches and warm the cache with them.
+        
+        Each video is cached under the same key as a single-video lookup, so
+        the interactive routes are served from the refreshed data.
+        snapshot_min_interval overrides the snapshot store's minimum spacing.
+        """
+        items = self._fetch_video_items(video_ids, snapshot=True, snapshot_min_interval=snapshot_min_interval)
+        self._warm_cache(self.youtube.videos, items)
+        return [VideoRecord.from_api(item) for item in items]
+
+    def refresh_channels(self, channel_ids):
+        """Fetch current details of many channels in batches and warm the cache with them."""
+        items = self._get_channels_by_ids(channel_ids)
+        self._warm_cache(self.youtube.channels, items)
+        return [ChannelRecord.from_api(item) for item in items]
+
+    def _warm_cache(self, resource, items):
+        """Cache batch-fetched resources as the responses of single-ID lookups."""
+        if self.cache is None:
+            return
+        for item in items:
+            request = resource().list(part='snippet,statistics,contentDetails', id=item['id'])
+            self.cache.set(request, {'items': [item]})
+
+    def _get_videos_by_ids(self, video_ids, keep_description=True, snapshot=False, index_tags=False):
+        """Get VideoRecords for videos in batches of up to 50 IDs per call."""
+        return [
+            VideoRecord.from_api(item, keep_description)
+            for item in self._fetch_video_items(video_ids, snapshot, index_tags=index_tags)
+        ]
+
+    def _fetch_video_items(self, video_ids, snapshot=False, snapshot_min_interval=None, index_tags=False):
+        """Get the raw resources of videos in batches of up to 50 IDs per call.
+        
+        With snapshot, statistics fetched from the API rather than served
+        from the cache are recorded in the snapshot store. With index_tags,
+        the videos are added to the tag index.
+        """
+        videos_by_id = {}
+        for start in range(0, len(video_ids), MAX_IDS_PER_REQUEST):
+            batch = video_ids[start:start + MAX_IDS_PER_REQUEST]
+            response, cached = self._execute_request(self.youtube.videos().list(
+                part='snippet,statistics,contentDetails',
+                id=','.join(batch),
+                maxResults=len(batch)
+            ))
+            if snapshot and not cached:
+                self._record_snapshots(response['items'], snapshot_min_interval)
+            for video in response['items']:
+                videos_by_id[video['id']] = video
+        
+        # Keep playlist order and skip videos that are private or deleted
+        items = [videos_by_id[video_id] for video_id in video_ids if video_id in videos_by_id]
+        if index_tags:
+            self._index_video_items(items)
+        return items
+
     def _analyze_upload_frequency(self, videos_data):
         """Analyze channel's upload frequency patterns."""
         if not videos_data:
@@ -319,11 +983,7 @@ class YouTubeService:
             }
             
         # Sort videos by publish date
-        publish_dates = [
-            datetime.strptime(video['snippet']['publishedAt'], '%Y-%m-%dT%H:%M:%SZ')
-            for video in videos_data
-        ]
-        publish_dates.sort()
+        publish_dates = sorted(video.published_at for video in videos_data)
         
         if len(publish_dates) < 2:
             return {
@@ -363,86 +1023,38 @@ class YouTubeService:
                 'top_performing_videos': []
             }
             
-        # Calculate metrics for each video
-        video_metrics = []
-        for video in videos_data:
-            stats = video['statistics']
-            engagement = self._calculate_engagement_rate(
-                int(stats.get('viewCount', 0)),
-                int(stats.get('likeCount', 0)),
-                int(stats.get('commentCount', 0))
-            )
-            
-            video_metrics.append({
-                'title': video['snippet']['title'],
-                'views': int(stats.get('viewCount', 0)),
-                'engagement_rate': engagement,
-                'published_at': video['snippet']['publishedAt']
-            })
-            
-        # Sort by views to get top performing videos
-        top_videos = sorted(video_metrics, key=lambda x: x['views'], reverse=True)[:5]
+        # Pick the top performing videos by views
+        top_videos = heapq.nlargest(5, videos_data, key=lambda video: video.views)
         
         # Analyze trends
-        recent_videos = sorted(video_metrics, key=lambda x: x['published_at'])[-5:]
-        old_videos = sorted(video_metrics, key=lambda x: x['published_at'])[:5]
+        by_date = sorted(videos_data, key=lambda video: video.published_at)
+        recent_videos = by_date[-5:]
+        old_videos = by_date[:5]
         
-        avg_recent_views = sum(v['views'] for v in recent_videos) / len(recent_videos)
-        avg_old_views = sum(v['views'] for v in old_videos) / len(old_videos)
+        avg_recent_views = sum(v.views for v in recent_videos) / len(recent_videos)
+        avg_old_views = sum(v.views for v in old_videos) / len(old_videos)
         
         view_trend = 'Increasing' if avg_recent_views > avg_old_views else 'Decreasing'
         
         return {
             'view_trend': view_trend,
-            'top_performing_videos': top_videos,
-            'average_views': sum(v['views'] for v in video_metrics) / len(video_metrics)
+            'top_performing_videos': [
+                {
+                    'title': video.title,
+                    'views': video.views,
+                    'engagement_rate': self._calculate_engagement_rate(video.views, video.likes, video.comments),
+                    'published_at': format_timestamp(video.published_at)
+                }
+                for video in top_videos
+            ],
+            'average_views': sum(v.views for v in videos_data) / len(videos_data)
         }
 
     def _analyze_comments_sentiment(self, comments):
         """Analyze sentiment of video comments."""
-        if not comments:
-            return {
-                'positive': 0,
-                'negative': 0,
-                'neutral': 0,
-                'total_comments': 0,
-                'negative_comments': []
-            }
-            
-        sentiments = {'positive': 0, 'negative': 0, 'neutral': 0}
-        negative_comments = []
-        
-        for comment in comments:
-            blob = TextBlob(comment['text'])
-            polarity = blob.sentiment.polarity
-            
-            if polarity > 0.1:
-                sentiments['positive'] += 1
-            elif polarity < -0.1:
-                sentiments['negative'] += 1
-                # Store negative comments with their polarity score
-                negative_comments.append({
-                    'text': comment['text'],
-                    'author': comment['author'],
-                    'polarity': polarity,
-                    'published_at': comment['publishedAt']
-                })
-            else:
-                sentiments['neutral'] += 1
-                
-        total = len(comments)
-        
-        # Sort negative comments by polarity (most negative first) and take top 10
-        negative_comments.sort(key=lambda x: x['polarity'])
-        top_negative_comments = negative_comments[:10]
-        
-        return {
-            'positive': (sentiments['positive'] / total) * 100,
-            'negative': (sentiments['negative'] / total) * 100,
-            'neutral': (sentiments['neutral'] / total) * 100,
-            'total_comments': total,
-            'negative_comments': top_negative_comments
-        }
+        aggregator = SentimentAggregator(self.sentiment_engine)
+        aggregator.add(comments)
+        return aggregator.result()
 
     def _analyze_video_tags(self, tags):
         """Analyze video tags and their effectiveness."""
@@ -469,11 +1081,11 @@ class YouTubeService:
             ]
         }
 
-    def _calculate_engagement_metrics(self, video_data):
+    def _calculate_engagement_metrics(self, video):
         """Calculate detailed engagement metrics."""
-        views = int(video_data['viewCount'])
-        likes = int(video_data['likeCount'])
-        comments = int(video_data['commentCount'])
+        views = video.views
+        likes = video.likes
+        comments = video.comments
         
         if views == 0:
             return {
@@ -0,0 +1,93 @@
+"""Load test showing how request coalescing cuts upstream API calls for a trending video.
+
+Many threads analyze the same video at once against a simulated API with
+fixed latency, with and without single-flight coalescing. The response
+cache is disabled so that only coalescing is measured.
+
+Run from the project root:
+    python -m benchmarks.coalescing_load_test [--clients 50] [--latency 0.2]
+"""
+import argparse
+import os
+import threading
+import time
+
+os.environ.setdefault('YOUTUBE_API_KEY', 'benchmark')
+os.environ.setdefault('CHANNEL_INDEX_PATH', 'none')
+os.environ.setdefault('SNAPSHOT_DIR', 'none')
+os.environ.setdefault('TAG_INDEX_PATH', 'none')
+
+from app.youtube_service import YouTubeService
+
+VIDEO = {
+    'id': 'dQw4w9WgXcQ',
+    'snippet': {'title': 'Trending video', 'description': '', 'publishedAt': '2024-01-01T00:00:00Z'},
+    'statistics': {'viewCount': '1000000', 'likeCount': '50000', 'commentCount': '100'},
+    'contentDetails': {'duration': 'PT3M33S'}
+}
+COMMENT_TEXTS = ('great video, love it', 'this is awful', 'ok I guess', 'best song ever', 'boring')
+COMMENTS = {
+    'items': [
+        {
+            'id': f'comment{i}',
+            'snippet': {'topLevelComment': {'snippet': {
+                'authorDisplayName': f'user{i}',
+                'textDisplay': COMMENT_TEXTS[i % len(COMMENT_TEXTS)],
+                'publishedAt': '2024-01-02T00:00:00Z',
+                'likeCount': i
+            }}}
+        }
+        for i in range(100)
+    ]
+}
+
+
+def simulated_api(latency):
+    def send(request):
+        time.sleep(latency)
+        if request.methodId == 'youtube.videos.list':
+            return {'items': [VIDEO]}
+        return COMMENTS
+    return send
+
+
+def run(clients, latency, coalesce):
+    service = YouTubeService()
+    service.cache = None
+    service.comment_store = None
+    service._send = simulated_api(latency)
+    if not coalesce:
+        service.single_flight = None
+
+    barrier = threading.Barrier(clients)
+
+    def client():
+        barrier.wait()
+        service.get_video_performance(f"https://www.youtube.com/watch?v={VIDEO['id']}")
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(service.get_api_call_counts().values()), elapsed, service.get_coalescing_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.2, help='Simulated seconds per API call')
+    args = parser.parse_args()
+
+    print(f'{args.clients} concurrent /analyze-video requests for the same video')
+    print(f'{"mode":<12} {"API calls":>9} {"seconds":>8}')
+    for name, coalesce in (('independent', False), ('coalesced', True)):
+        calls, elapsed, stats = run(args.clients, args.latency, coalesce)
+        print(f'{name:<12} {calls:>9} {elapsed:>8.2f}')
+    print(f"coalescing counters: {stats}")
+
+
+if __name__ == '__main__':
+    main()
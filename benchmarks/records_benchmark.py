@@ -0,0 +1,134 @@
+"""Compare channel analysis on raw API dicts against VideoRecords.
+
+Run from the project root:
+    python -m benchmarks.records_benchmark [--videos 5000] [--repeat 5]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime
+
+from app.records import VideoRecord
+from app.youtube_service import YouTubeService
+from benchmarks.synthetic import generate_videos
+
+
+def legacy_upload_frequency(videos_data):
+    """The upload frequency analysis as it ran on raw API dicts."""
+    publish_dates = [
+        datetime.strptime(video['snippet']['publishedAt'], '%Y-%m-%dT%H:%M:%SZ')
+        for video in videos_data
+    ]
+    publish_dates.sort()
+    time_diffs = [(publish_dates[i+1] - publish_dates[i]).days for i in range(len(publish_dates)-1)]
+    avg_frequency = sum(time_diffs) / len(time_diffs)
+    recent_freq = sum(time_diffs[:5]) / 5 if len(time_diffs) >= 5 else avg_frequency
+    old_freq = sum(time_diffs[-5:]) / 5 if len(time_diffs) >= 5 else avg_frequency
+    if recent_freq < old_freq:
+        trend = 'Increasing upload frequency'
+    elif recent_freq > old_freq:
+        trend = 'Decreasing upload frequency'
+    else:
+        trend = 'Stable upload frequency'
+    return {
+        'average_frequency': round(avg_frequency, 1),
+        'total_videos': len(videos_data),
+        'frequency_trend': trend
+    }
+
+
+def legacy_performance_trends(videos_data, engagement_rate):
+    """The performance trend analysis as it ran on raw API dicts."""
+    video_metrics = []
+    for video in videos_data:
+        stats = video['statistics']
+        engagement = engagement_rate(
+            int(stats.get('viewCount', 0)),
+            int(stats.get('likeCount', 0)),
+            int(stats.get('commentCount', 0))
+        )
+        video_metrics.append({
+            'title': video['snippet']['title'],
+            'views': int(stats.get('viewCount', 0)),
+            'engagement_rate': engagement,
+            'published_at': video['snippet']['publishedAt']
+        })
+    top_videos = sorted(video_metrics, key=lambda x: x['views'], reverse=True)[:5]
+    recent_videos = sorted(video_metrics, key=lambda x: x['published_at'])[-5:]
+    old_videos = sorted(video_metrics, key=lambda x: x['published_at'])[:5]
+    avg_recent_views = sum(v['views'] for v in recent_videos) / len(recent_videos)
+    avg_old_views = sum(v['views'] for v in old_videos) / len(old_videos)
+    return {
+        'view_trend': 'Increasing' if avg_recent_views > avg_old_views else 'Decreasing',
+        'top_performing_videos': top_videos,
+        'average_views': sum(v['views'] for v in video_metrics) / len(video_metrics)
+    }
+
+
+def retained_bytes(ingest, pages):
+    """Get the memory still held by what ingest() builds from the JSON response pages."""
+    gc.collect()
+    tracemalloc.start()
+    kept = ingest(pages)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size
+
+
+def best_time(run, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--videos', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    # The analysis methods need no API access, so skip the client setup
+    service = YouTubeService.__new__(YouTubeService)
+    videos = generate_videos(args.videos)
+    pages = [json.dumps({'items': videos[start:start + 50]}) for start in range(0, len(videos), 50)]
+
+    def ingest_raw(pages):
+        return [item for page in pages for item in json.loads(page)['items']]
+
+    def ingest_records(pages):
+        return [VideoRecord.from_api(item, keep_description=False)
+                for page in pages for item in json.loads(page)['items']]
+
+    raw = ingest_raw(pages)
+    records = ingest_records(pages)
+
+    def analyze_raw():
+        return (legacy_upload_frequency(raw),
+                legacy_performance_trends(raw, service._calculate_engagement_rate))
+
+    def analyze_records():
+        return (service._analyze_upload_frequency(records), service._analyze_performance_trends(records))
+
+    identical = analyze_raw() == analyze_records()
+    rows = (
+        ('raw dicts', retained_bytes(ingest_raw, pages),
+         best_time(analyze_raw, args.repeat), best_time(lambda: ingest_raw(pages), args.repeat)),
+        ('records', retained_bytes(ingest_records, pages),
+         best_time(analyze_records, args.repeat), best_time(lambda: ingest_records(pages), args.repeat)),
+    )
+
+    print(f'{args.videos} videos, identical analysis: {identical}')
+    print(f'{"representation":<16} {"retained MB":>12} {"analysis ms":>12} {"ingest ms":>10}')
+    for name, size, analysis, ingest in rows:
+        print(f'{name:<16} {size / 1e6:>12.2f} {analysis * 1000:>12.1f} {ingest * 1000:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
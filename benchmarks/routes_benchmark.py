@@ -0,0 +1,123 @@
+"""End-to-end latency, API call counts and peak memory of the analysis routes.
+
+Requests go through the Flask app, with API calls answered by a synthetic
+channel of N videos with M comments each, or replayed from fixtures
+recorded with YOUTUBE_TRANSPORT=record. The response cache is off unless
+--cache is given, so every run does the full work.
+
+Run from the project root:
+    python -m benchmarks.routes_benchmark [--videos 500] [--comments 1000] [--repeat 5] [--latency 0.05]
+    python -m benchmarks.routes_benchmark --fixtures fixtures --video URL --channel URL
+"""
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+
+os.environ.setdefault('YOUTUBE_API_KEY', 'benchmark')
+os.environ.setdefault('CHANNEL_INDEX_PATH', 'none')
+os.environ.setdefault('SNAPSHOT_DIR', 'none')
+os.environ.setdefault('TAG_INDEX_PATH', 'none')
+
+from app import create_app
+from app.cache import ResponseCache
+from app.quota import QuotaScheduler
+from app.routes import youtube_service
+from app.transport import FixtureStore, ReplayTransport
+from benchmarks.synthetic import SyntheticYouTube
+
+# Bulk analyses cover at most this many of the synthetic videos
+BULK_VIDEOS = 50
+
+
+def benchmark_cases(video_urls, channel_url):
+    """Get (name, path, request arguments) of every route to measure."""
+    video_url = video_urls[0]
+    return (
+        ('analyze-video', '/analyze-video', {'data': {'video_url': video_url}}),
+        ('video-comments', '/video-comments', {'data': {'video_url': video_url}}),
+        ('video-comments stream', '/video-comments', {'data': {'video_url': video_url, 'stream': '1'}}),
+        ('analyze-videos', '/analyze-videos', {'json': {'videos': video_urls[:BULK_VIDEOS]}}),
+        ('analyze-channel', '/analyze-channel', {'data': {'channel_url': channel_url}}),
+        ('analyze-channel full', '/analyze-channel', {'data': {'channel_url': channel_url, 'full_history': '1'}}),
+    )
+
+
+def run_case(client, path, kwargs):
+    """Make one request and read the whole response, streamed or not."""
+    response = client.post(path, **kwargs)
+    body = response.get_data()
+    return response.status_code, body
+
+
+def measure(client, path, kwargs, repeat):
+    """Get latencies of repeated requests, then API calls and peak memory of one more."""
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status, body = run_case(client, path, kwargs)
+        latencies.append(time.perf_counter() - start)
+        if status != 200:
+            return {'error': f'HTTP {status}: {body[:200].decode(errors="replace")}'}
+
+    # Memory tracing slows everything down, so it gets a run of its own
+    youtube_service.reset_api_call_counts()
+    tracemalloc.start()
+    status, body = run_case(client, path, kwargs)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'median': statistics.median(latencies),
+        'min': min(latencies),
+        'api_calls': sum(youtube_service.get_api_call_counts().values()),
+        'peak_bytes': peak,
+        'size': len(body)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--videos', type=int, default=500, help='Uploads of the synthetic channel')
+    parser.add_argument('--comments', type=int, default=1000, help='Comments per synthetic video')
+    parser.add_argument('--latency', type=float, default=0.0, help='Simulated seconds per API call')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cache', action='store_true', help='Keep an in-memory response cache')
+    parser.add_argument('--fixtures', help='Replay recorded fixtures from this directory')
+    parser.add_argument('--video', action='append', help='Video URL to analyze with --fixtures')
+    parser.add_argument('--channel', help='Channel URL to analyze with --fixtures')
+    args = parser.parse_args()
+
+    if args.fixtures:
+        if not args.video or not args.channel:
+            parser.error('--fixtures needs --video and --channel')
+        fixtures = FixtureStore(args.fixtures)
+        youtube_service.transport = ReplayTransport(fixtures)
+        video_urls, channel_url = args.video, args.channel
+        source = f'{len(fixtures)} fixtures in {args.fixtures}'
+    else:
+        synthetic = SyntheticYouTube(args.videos, args.comments, latency=args.latency)
+        youtube_service.transport = synthetic
+        video_urls, channel_url = synthetic.video_urls, synthetic.channel_url
+        source = f'synthetic channel, {args.videos} videos with {args.comments} comments'
+
+    youtube_service.cache = ResponseCache() if args.cache else None
+    # Quota and rate limits would only measure the token bucket
+    youtube_service.scheduler = QuotaScheduler(daily_limit=10 ** 12, rate=10 ** 12, burst=10 ** 12)
+    client = create_app().test_client()
+
+    print(f'{source}, {args.repeat} runs per route, cache {"on" if args.cache else "off"}')
+    print(f'{"route":<22} {"median ms":>10} {"min ms":>9} {"API calls":>9} {"peak MB":>8} {"KB":>8}')
+    for name, path, kwargs in benchmark_cases(video_urls, channel_url):
+        result = measure(client, path, kwargs, args.repeat)
+        if 'error' in result:
+            print(f'{name:<22} {result["error"]}')
+            continue
+        print(
+            f'{name:<22} {result["median"] * 1000:>10.1f} {result["min"] * 1000:>9.1f} '
+            f'{result["api_calls"]:>9} {result["peak_bytes"] / 1e6:>8.2f} {result["size"] / 1e3:>8.1f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
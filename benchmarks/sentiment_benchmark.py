@@ -0,0 +1,55 @@
+"""Compare comment sentiment scoring against the original per-comment TextBlob loop.
+
+Run from the project root:
+    python -m benchmarks.sentiment_benchmark [--comments 10000]
+"""
+import argparse
+import time
+
+from textblob import TextBlob
+
+from app.sentiment import ParallelSentimentEngine, SentimentEngine, POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
+from benchmarks.synthetic import generate_comments
+
+
+def classify(polarities):
+    return [
+        'positive' if polarity > POSITIVE_THRESHOLD else 'negative' if polarity < NEGATIVE_THRESHOLD else 'neutral'
+        for polarity in polarities
+    ]
+
+
+def legacy_polarities(texts):
+    """The scoring loop _analyze_comments_sentiment originally used."""
+    return [TextBlob(text).sentiment.polarity for text in texts]
+
+
+def timed(score, texts):
+    start = time.perf_counter()
+    polarities = list(score(texts))
+    return polarities, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--comments', type=int, default=10000)
+    args = parser.parse_args()
+
+    texts = generate_comments(args.comments)
+    baseline, baseline_time = timed(legacy_polarities, texts)
+    print(f'{"engine":<12} {"seconds":>8} {"speedup":>8}  identical')
+    print(f'{"textblob":<12} {baseline_time:>8.3f} {1:>8.1f}x  -')
+
+    parallel_engine = ParallelSentimentEngine()
+    # Start the worker processes outside of the measurement
+    parallel_engine.polarities(generate_comments(4000, seed=1))
+    for name, engine in (('batch', SentimentEngine()), ('parallel', parallel_engine)):
+        polarities, elapsed = timed(engine.polarities, texts)
+        identical = classify(polarities) == classify(baseline) and all(
+            abs(a - b) < 1e-9 for a, b in zip(polarities, baseline)
+        )
+        print(f'{name:<12} {elapsed:>8.3f} {baseline_time / elapsed:>8.1f}x  {identical}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Cold-start latency of a fresh app process, as paid by every new worker.
+
+Each run starts a new interpreter, like a gunicorn worker being spawned,
+and times importing the app, create_app(), the first /analyze-video
+request (which builds the API client and loads the sentiment backend) and
+a second one. API calls are answered by a small synthetic channel.
+
+Run from the project root:
+    python -m benchmarks.startup_benchmark [--runs 5] [--warm-up]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PHASES = ('import', 'create_app', 'warm_up', 'first_request', 'second_request')
+
+
+def probe(warm_up):
+    """Time the startup phases in this process and print them as JSON."""
+    os.environ.setdefault('YOUTUBE_API_KEY', 'benchmark')
+    os.environ.setdefault('CHANNEL_INDEX_PATH', 'none')
+    os.environ.setdefault('SNAPSHOT_DIR', 'none')
+    os.environ.setdefault('TAG_INDEX_PATH', 'none')
+    os.environ.setdefault('YOUTUBE_CACHE_BACKEND', 'none')
+    timings = {}
+
+    start = time.perf_counter()
+    from app import create_app
+    from app.routes import youtube_service
+    timings['import'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    app = create_app()
+    timings['create_app'] = time.perf_counter() - start
+
+    # What a master process would do before forking workers with gunicorn --preload
+    start = time.perf_counter()
+    if warm_up:
+        youtube_service.warm_up()
+    timings['warm_up'] = time.perf_counter() - start
+
+    from benchmarks.synthetic import SyntheticYouTube
+
+    synthetic = SyntheticYouTube(videos=1, comments=100)
+    youtube_service.transport = synthetic
+    client = app.test_client()
+    for phase in ('first_request', 'second_request'):
+        start = time.perf_counter()
+        response = client.post('/analyze-video', data={'video_url': synthetic.video_urls[0]})
+        timings[phase] = time.perf_counter() - start
+        if response.status_code != 200:
+            raise SystemExit(f'/analyze-video failed: {response.get_data(as_text=True)}')
+    print(json.dumps(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--warm-up', action='store_true', help='Call warm_up() right after create_app()')
+    parser.add_argument('--probe', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.probe:
+        probe(args.warm_up)
+        return
+
+    command = [sys.executable, '-m', 'benchmarks.startup_benchmark', '--probe']
+    if args.warm_up:
+        command.append('--warm-up')
+    runs = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        timings['process'] = time.perf_counter() - start
+        runs.append(timings)
+
+    print(f'{args.runs} fresh processes, warm-up {"on" if args.warm_up else "off"}')
+    print(f'{"phase":<16} {"median ms":>10} {"min ms":>9}')
+    for phase in PHASES + ('process',):
+        values = [timings[phase] for timings in runs]
+        print(f'{phase:<16} {statistics.median(values) * 1000:>10.1f} {min(values) * 1000:>9.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""Synthetic YouTube data for benchmarks: a channel with N videos, each with M comments.
+
+SyntheticYouTube is a transport, so a YouTubeService can run every
+analysis against it without network access or quota:
+    service.transport = SyntheticYouTube(videos=1000, comments=500)
+"""
+import random
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse, parse_qsl
+
+CHANNEL_ID = 'UCbenchmarkchannel0000000'
+
+VIDEO_WORDS = 'video music tutorial review live update news how to best new first part official trailer'.split()
+COMMENT_WORDS = (
+    'great awesome love amazing best helpful thanks good nice clear '
+    'bad terrible awful worst boring hate wrong useless annoying slow '
+    'video part first time watch channel music song tutorial explanation '
+    'not very really so too the this is was a and but i you it'
+).split()
+
+
+def generate_videos(count, seed=42, channel_id=CHANNEL_ID):
+    """Generate video resources shaped like videos().list items, newest first."""
+    rng = random.Random(seed)
+    published = datetime(2024, 1, 1)
+    videos = []
+    for i in range(count):
+        published -= timedelta(days=rng.randint(0, 6), hours=rng.randint(0, 23))
+        views = rng.randint(100, 5000000)
+        thumbnail = {'url': f'https://i.ytimg.com/vi/video{i}/default.jpg', 'width': 120, 'height': 90}
+        videos.append({
+            'kind': 'youtube#video',
+            'etag': f'etag-{i:08d}-{rng.getrandbits(64):016x}',
+            'id': f'video{i:06d}',
+            'snippet': {
+                'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'channelId': channel_id,
+                'title': ' '.join(rng.choices(VIDEO_WORDS, k=rng.randint(3, 10))),
+                'description': ' '.join(rng.choices(VIDEO_WORDS, k=rng.randint(50, 300))),
+                'thumbnails': {size: dict(thumbnail) for size in ('default', 'medium', 'high', 'standard')},
+                'channelTitle': 'Benchmark Channel',
+                'tags': rng.sample(VIDEO_WORDS, rng.randint(0, 8)),
+                'categoryId': '22',
+                'liveBroadcastContent': 'none',
+                'localized': {'title': 'Localized title', 'description': 'Localized description'}
+            },
+            'contentDetails': {
+                'duration': f'PT{rng.randint(1, 59)}M{rng.randint(0, 59)}S',
+                'dimension': '2d',
+                'definition': 'hd',
+                'caption': 'false',
+                'licensedContent': True,
+                'contentRating': {},
+                'projection': 'rectangular'
+            },
+            'statistics': {
+                'viewCount': str(views),
+                'likeCount': str(views // rng.randint(20, 100)),
+                'favoriteCount': '0',
+                'commentCount': str(views // rng.randint(200, 1000))
+            }
+        })
+    return videos
+
+
+def generate_comments(count, seed=42):
+    """Generate synthetic comments, with the repetition real comment sections have."""
+    rng = random.Random(seed)
+    common = [' '.join(rng.choices(COMMENT_WORDS, k=rng.randint(1, 4))) for _ in range(50)]
+    comments = []
+    for _ in range(count):
+        if rng.random() < 0.2:
+            comments.append(rng.choice(common))
+        else:
+            comments.append(' '.join(rng.choices(COMMENT_WORDS, k=rng.randint(3, 30))))
+    return comments
+
+
+class SyntheticYouTube:
+    """Transport answering API requests from a generated channel.
+
+    The channel holds `videos` uploads and every video has `comments`
+    comments. Responses are paged like the real API, and `latency` seconds
+    are slept per request to stand in for the network.
+    """
+
+    def __init__(self, videos=50, comments=100, latency=0.0, seed=42, channel_id=CHANNEL_ID):
+        self.channel_id = channel_id
+        self.latency = latency
+        self.videos = generate_videos(videos, seed, channel_id)
+        self._videos_by_id = {video['id']: video for video in self.videos}
+        self._comment_texts = generate_comments(comments, seed)
+
+    @property
+    def video_urls(self):
+        return [f"https://www.youtube.com/watch?v={video['id']}" for video in self.videos]
+
+    @property
+    def channel_url(self):
+        return f'https://www.youtube.com/channel/{self.channel_id}'
+
+    def execute(self, request):
+        if self.latency:
+            time.sleep(self.latency)
+        params = dict(parse_qsl(urlparse(request.uri).query))
+        resource = request.methodId.split('.')[1]
+        return getattr(self, f'_{resource}')(params)
+
+    def _page(self, total, params, build_item, default_max_results=5):
+        """Build the page of items that maxResults and pageToken ask for.
+
+        Only the items of the page are built, so generating a page does not
+        grow with the size of the channel or comment section.
+        """
+        start = int(params.get('pageToken', 0))
+        end = min(start + int(params.get('maxResults', default_max_results)), total)
+        response = {'pageInfo': {'totalResults': total}, 'items': [build_item(i) for i in range(start, end)]}
+        if end < total:
+            response['nextPageToken'] = str(end)
+        return response
+
+    def _search(self, params):
+        return {'items': [{'snippet': {'channelId': self.channel_id}}]}
+
+    def _channels(self, params):
+        if self.channel_id not in params['id'].split(','):
+            return {'items': []}
+        return {'items': [{
+            'id': self.channel_id,
+            'snippet': {
+                'title': 'Benchmark Channel',
+                'description': 'A synthetic channel',
+                'publishedAt': '2010-01-01T00:00:00Z'
+            },
+            'statistics': {
+                'subscriberCount': '100000',
+                'videoCount': str(len(self.videos)),
+                'viewCount': str(sum(int(video['statistics']['viewCount']) for video in self.videos))
+            },
+            'contentDetails': {'relatedPlaylists': {'uploads': 'UU' + self.channel_id[2:]}}
+        }]}
+
+    def _playlistItems(self, params):
+        if params['playlistId'] != 'UU' + self.channel_id[2:]:
+            return {'pageInfo': {'totalResults': 0}, 'items': []}
+        return self._page(
+            len(self.videos), params, lambda i: {'contentDetails': {
+                'videoId': self.videos[i]['id'],
+                'videoPublishedAt': self.videos[i]['snippet']['publishedAt']
+            }}
+        )
+
+    def _videos(self, params):
+        ids = params['id'].split(',')
+        return {'items': [self._videos_by_id[video_id] for video_id in ids if video_id in self._videos_by_id]}
+
+    def _commentThreads(self, params):
+        video_id = params['videoId']
+        if video_id not in self._videos_by_id:
+            return {'items': []}
+
+        def build_comment(i):
+            return {
+                'id': f'{video_id}-comment{i:06d}',
+                'snippet': {'topLevelComment': {'snippet': {
+                    'authorDisplayName': f'user{i}',
+                    'textDisplay': self._comment_texts[i],
+                    'publishedAt': '2024-01-02T00:00:00Z',
+                    'likeCount': i % 50
+                }}}
+            }
+        return self._page(len(self._comment_texts), params, build_comment, default_max_results=20)
@@ -0,0 +1,144 @@
+"""Exact YouTube API call counts of every analysis route.
+
+API calls are answered by the synthetic transport from the benchmarks, so
+no network access or API key is needed. Run from the project root:
+    python -m pytest tests
+"""
+import json
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault('YOUTUBE_API_KEY', 'test')
+os.environ.setdefault('CHANNEL_INDEX_PATH', 'none')
+os.environ.setdefault('SNAPSHOT_DIR', 'none')
+os.environ.setdefault('TAG_INDEX_PATH', 'none')
+
+from app import create_app
+from app.comment_store import CommentStore
+from app.quota import QuotaScheduler
+from app.routes import youtube_service
+from benchmarks.synthetic import SyntheticYouTube
+
+
+class ApiCallCountTest(unittest.TestCase):
+
+    def setUp(self):
+        self.youtube = SyntheticYouTube(videos=60, comments=30)
+        youtube_service.transport = self.youtube
+        # Cached responses would hide repeated calls
+        youtube_service.cache = None
+        youtube_service.scheduler = QuotaScheduler(daily_limit=10 ** 9, rate=10 ** 9, burst=10 ** 9)
+        youtube_service.reset_api_call_counts()
+        self.client = create_app().test_client()
+
+    def assertApiCalls(self, path, expected, **kwargs):
+        response = self.client.post(path, **kwargs)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        self.assertEqual(
+            youtube_service.get_api_call_counts(),
+            {f'youtube.{resource}.list': count for resource, count in expected.items()}
+        )
+
+    def test_analyze_video(self):
+        self.assertApiCalls(
+            '/analyze-video', {'videos': 1, 'commentThreads': 1},
+            data={'video_url': self.youtube.video_urls[0]}
+        )
+
+    def test_analyze_channel(self):
+        self.assertApiCalls(
+            '/analyze-channel', {'channels': 1, 'playlistItems': 1, 'videos': 1},
+            data={'channel_url': self.youtube.channel_url}
+        )
+
+    def test_analyze_channel_by_handle(self):
+        # The handle is resolved with one search for the whole analysis
+        self.assertApiCalls(
+            '/analyze-channel', {'search': 1, 'channels': 1, 'playlistItems': 1, 'videos': 1},
+            data={'channel_url': 'https://www.youtube.com/@benchmark'}
+        )
+
+    def test_analyze_channel_flags_off(self):
+        # full_history=0 is the default 50-upload analysis, not a full history walk
+        for value in ('0', 'false', 'no'):
+            youtube_service.reset_api_call_counts()
+            self.assertApiCalls(
+                '/analyze-channel', {'channels': 1, 'playlistItems': 1, 'videos': 1},
+                data={'channel_url': self.youtube.channel_url, 'full_history': value, 'async': value}
+            )
+
+    def test_analyze_channel_full_history(self):
+        self.assertApiCalls(
+            '/analyze-channel', {'channels': 1, 'playlistItems': 2, 'videos': 2},
+            data={'channel_url': self.youtube.channel_url, 'full_history': 'true'}
+        )
+
+    def test_analyze_videos(self):
+        # Different URLs of the same video are analyzed once
+        video_id = self.youtube.videos[0]['id']
+        videos = [video_id, f'https://youtu.be/{video_id}', self.youtube.video_urls[0], self.youtube.video_urls[1]]
+        self.assertApiCalls('/analyze-videos', {'videos': 1, 'commentThreads': 2}, json={'videos': videos})
+
+    def test_analyze_videos_duplicate_missing_video(self):
+        # Every input naming the video gets its error, and it is looked up once
+        videos = ['missing01', 'https://youtu.be/missing01']
+        response = self.client.post('/analyze-videos', json={'videos': videos})
+        entries = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(
+            sorted((entry['video'], entry['error']) for entry in entries),
+            [('https://youtu.be/missing01', 'Video not found'), ('missing01', 'Video not found')]
+        )
+        self.assertEqual(
+            youtube_service.get_api_call_counts(),
+            {'youtube.videos.list': 1, 'youtube.commentThreads.list': 1}
+        )
+        results = youtube_service.get_videos_performance(videos)
+        self.assertEqual([entry['video'] for entry in results], videos)
+        self.assertTrue(all(entry['error'] == 'Video not found' for entry in results))
+
+    def test_analyze_videos_rejects_invalid_lists(self):
+        for videos in ('video000001', ['video000001', 123], ['video000001'] * 501):
+            response = self.client.post('/analyze-videos', json={'videos': videos})
+            self.assertEqual(response.status_code, 400)
+        self.assertEqual(youtube_service.get_api_call_counts(), {})
+
+    def test_video_comments(self):
+        self.assertApiCalls(
+            '/video-comments', {'commentThreads': 1},
+            data={'video_url': self.youtube.video_urls[0]}
+        )
+
+    def test_comment_routes_reject_invalid_limits(self):
+        for path in ('/video-comments', '/export/comments'):
+            for limits in ({'max_comments': '0'}, {'max_comments': '-5'}, {'time_budget': '0'}):
+                response = self.client.post(
+                    path, data=dict(limits, video_url=self.youtube.video_urls[0], stream='true')
+                )
+                self.assertEqual(response.status_code, 400)
+        self.assertEqual(youtube_service.get_api_call_counts(), {})
+
+    def test_video_analytics(self):
+        self.assertApiCalls(
+            '/video-analytics', {'videos': 1},
+            data={'video_url': self.youtube.video_urls[0]}
+        )
+
+    def test_comment_sync_backfills_capped_syncs(self):
+        # Capped syncs walk whole pages of 100 and later syncs resume where they stopped
+        with tempfile.TemporaryDirectory() as directory:
+            youtube_service.comment_store = CommentStore(os.path.join(directory, 'comments.sqlite3'))
+            try:
+                youtube = SyntheticYouTube(videos=1, comments=450)
+                youtube_service.transport = youtube
+                for total, complete in ((200, False), (400, False), (450, True), (450, True)):
+                    youtube_service.reset_api_call_counts()
+                    sentiment = youtube_service.sync_comment_sentiment(youtube.video_urls[0], max_comments=150)
+                    self.assertEqual((sentiment['total_comments'], sentiment['complete']), (total, complete))
+                self.assertEqual(youtube_service.get_api_call_counts(), {'youtube.commentThreads.list': 1})
+            finally:
+                youtube_service.comment_store = None
+
+
+if __name__ == '__main__':
+    unittest.main()